@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted: 429 if the queue is full, 503 if it waited too long."""
+
+    def __init__(self, traffic_class: str, status_code: int, retry_after: int):
+        super().__init__(f"Too many concurrent {traffic_class} requests, retry in {retry_after}s")
+        self.traffic_class = traffic_class
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TrafficClass:
+    """
+    Concurrency limit with a bounded wait queue for one class of work.
+    Blocking work runs on the class's own thread pool (one thread per slot), so a burst
+    in one class cannot take threads from, or queue in front of, another class.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, retry_after: int,
+                 dedicated_threads: bool = True):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=limit, thread_name_prefix=name) if dedicated_threads else None
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(self.name, 429, self.retry_after)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AdmissionRejected(self.name, 503, self.retry_after)
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Runs a blocking call once admitted, on this class's thread pool (or the default one)."""
+        async with self.admit():
+            return await asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args))
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting,
+                "max_queue": self.max_queue, "rejected": self.rejected}
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
+
+def traffic_class_from_env(name: str, limit: int, max_queue: int, queue_timeout: float, retry_after: int,
+                           dedicated_threads: bool = True) -> TrafficClass:
+    """Builds a TrafficClass whose settings can be overridden with <NAME>_CONCURRENCY, <NAME>_QUEUE etc."""
+    prefix = name.upper()
+    return TrafficClass(
+        name,
+        limit=_env_int(f"{prefix}_CONCURRENCY", limit),
+        max_queue=_env_int(f"{prefix}_QUEUE", max_queue),
+        queue_timeout=float(os.environ.get(f"{prefix}_QUEUE_TIMEOUT", str(queue_timeout))),
+        retry_after=_env_int(f"{prefix}_RETRY_AFTER", retry_after),
+        dedicated_threads=dedicated_threads,
+    )
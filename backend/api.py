@@ -1,38 +1,87 @@
-from fastapi import FastAPI, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, UploadFile, File, BackgroundTasks, Request, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
-from sanction_search_v2 import sdnlist, uae_list, unsanctionslist, SanctionedPerson
+from sanction_search_v2 import SanctionedPerson, normalize_name
 import numpy as np
 import cv2
 from datetime import datetime
 import os
-import re
 import argparse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, Callable, Awaitable
 import pickle
 from pydantic import BaseModel
+import httpx
 from tqdm import tqdm
 from passporteye import read_mrz
+from passport_reader import mrz_fields
 import base64
+import binascii
+import io
+from PIL import Image
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from scraper import find_suspicious_links
+from search_client import HttpSearchClient, SCRAPER_BACKEND
+from sanctions_store import (MemorySanctionsStore, SqliteSanctionsStore, create_sanctions_store, check_passport_sanctions,
+                             SANCTIONS_BACKEND, SANCTIONS_DB_FILE)
+from response_cache import ResponseCache
+from snapshots import seed_missing_snapshots, refresh_snapshots, assemble_latest_snapshots, latest_snapshot_info, SOURCE_FILES
+from frame_filter import FrameFilter
+from admission import AdmissionRejected, traffic_class_from_env
+from screening_registry import (ScreenedNameRegistry, rescreen_changed_entries,
+                                save_rescreen_report, load_rescreen_report)
+from dataset_changes import diff_datasets, record_changes, changes_since
+from name_filter import load_or_build_name_filter
 
-# Global variable to store sanctioned persons
-SANCTIONED_PERSONS = []
+# Global store of sanctioned persons (in memory or SQLite, see SANCTIONS_BACKEND)
+SANCTIONS_STORE = MemorySanctionsStore()
 
 # Path to pickle file
 PICKLE_FILE = 'sanctioned_people_simplified.pkl'
+# Bloom filter over the name tokens of the served data, stored next to the pickle
+NAME_FILTER_FILE = os.path.splitext(PICKLE_FILE)[0] + '.bloom'
+NAME_FILTER = None
+
+# Names screened so far, re-checked against changed entries after each list refresh
+SCREENED_NAMES = ScreenedNameRegistry()
+
+# Screening responses keyed by normalized input and dataset version, shared by identical concurrent requests
+RESPONSE_CACHE = ResponseCache(maxsize=int(os.environ.get('RESPONSE_CACHE_SIZE', '1024')))
+
+# Largest accepted passport image, in bytes
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+# Images wider than this are decoded at 1/2, 1/4 or 1/8 resolution, keeping at least this width for MRZ OCR
+MRZ_MIN_WIDTH = int(os.environ.get('MRZ_MIN_WIDTH', '1200'))
+# Chunk size used when reading uploaded files
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Admission control per class of work, see admission.traffic_class_from_env for the env overrides.
+# Lookups get a wide limit and the default executor, so OCR and scraping bursts never queue in front of them.
+LOOKUP_CLASS = traffic_class_from_env("lookup", limit=64, max_queue=256, queue_timeout=2, retry_after=1,
+                                      dedicated_threads=False)
+OCR_CLASS = traffic_class_from_env("ocr", limit=2, max_queue=8, queue_timeout=10, retry_after=5)
+# The HTTP search backend is async and shares one connection pool, so it needs no threads and allows far more searches
+if SCRAPER_BACKEND == 'http':
+    SEARCH_CLIENT = HttpSearchClient()
+    SCRAPE_CLASS = traffic_class_from_env("scrape", limit=32, max_queue=128, queue_timeout=30, retry_after=5,
+                                          dedicated_threads=False)
+else:
+    SEARCH_CLIENT = None
+    SCRAPE_CLASS = traffic_class_from_env("scrape", limit=2, max_queue=8, queue_timeout=30, retry_after=10)
+
+# Frames accepted per webcam stream before giving up
+MAX_STREAM_FRAMES = int(os.environ.get('MAX_STREAM_FRAMES', '100'))
+# Laplacian variance below which a webcam frame is considered too blurry for OCR
+MIN_FRAME_SHARPNESS = float(os.environ.get('MIN_FRAME_SHARPNESS', '100'))
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    SANCTIONED_PERSONS = load_sanctions_list(PICKLE_FILE)
+    # Sanctions data is loaded by initialize_data when the module is imported
     yield
-    # Cleanup code
-    SANCTIONED_PERSONS = []
-    # Shutdown the scheduler when the app is stopped
+    # Shutdown the scheduler and close pooled search connections when the app is stopped
     scheduler.shutdown()
+    if SEARCH_CLIENT is not None:
+        await SEARCH_CLIENT.aclose()
 
 app = FastAPI(title="Sanctions Check API", description="API for checking passport images against sanctions lists", lifespan=lifespan)
 
@@ -45,40 +94,163 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Fast 429 / 503 with Retry-After when a class of work is saturated"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={"success": False, "message": str(exc), "match_found": False}
+    )
+
+class UploadTooLarge(Exception):
+    """Raised when a passport upload turns out to be larger than MAX_UPLOAD_BYTES"""
+
+def upload_too_large_response() -> JSONResponse:
+    """413 shaped like SanctionsCheckResponse, returned whether the size is known from the headers or the body"""
+    return JSONResponse(status_code=413, content={
+        "success": False,
+        "message": f"Image too large, maximum is {MAX_UPLOAD_BYTES} bytes",
+        "match_found": False
+    })
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large_handler(request: Request, exc: UploadTooLarge):
+    return upload_too_large_response()
+
+class UploadSizeLimit:
+    """
+    ASGI middleware rejecting oversized passport uploads with 413 before their body is buffered:
+    from the Content-Length header, or by counting body bytes as they arrive when there is none
+    (chunked requests). Once the limit is crossed the app sees a client disconnect, and whatever
+    it still sends is dropped in favour of the 413.
+    """
+
+    PATHS = ("/check-passport-file/", "/check-passport-base64/")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.PATHS:
+            await self.app(scope, receive, send)
+            return
+        # Base64 bodies are a third larger than the image they carry, plus some JSON / multipart overhead
+        limit = MAX_UPLOAD_BYTES * 4 // 3 + 64 * 1024
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await upload_too_large_response()(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    rejected = True
+                    await upload_too_large_response()(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+app.add_middleware(UploadSizeLimit)
+
 class SanctionsCheckResponse(BaseModel):
     success: bool
     message: str
     match_found: bool
     match_details: Optional[Dict[str, Any]] = None
+    # True when the adverse-media search was skipped because the scraper was saturated or the search failed
+    adverse_media_skipped: bool = False
+
+def decode_passport_image(image_bytes: bytes) -> Optional[np.ndarray]:
+    """
+    Decodes an uploaded image straight to grayscale, at reduced resolution when it is larger
+    than MRZ OCR needs. The reduction factor is chosen from the image header before decoding.
+    Returns None for empty or undecodable data.
+    """
+    if not image_bytes:
+        return None
+    try:
+        width, _ = Image.open(io.BytesIO(image_bytes)).size  # Reads the header only
+    except Exception:
+        width = 0
+    flag = cv2.IMREAD_GRAYSCALE
+    for factor, reduced_flag in ((8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+                                 (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+                                 (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)):
+        if width // factor >= MRZ_MIN_WIDTH:
+            flag = reduced_flag
+            break
+    try:
+        return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flag)
+    except cv2.error:
+        return None
+
+async def read_upload_limited(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytearray:
+    """Reads an uploaded file in chunks, failing with 413 as soon as it exceeds max_bytes"""
+    contents = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return contents  # The bytearray itself, copying it would double peak memory
+        if len(contents) + len(chunk) > max_bytes:
+            raise UploadTooLarge()
+        contents.extend(chunk)
 
-def read_passport_image(image) -> Optional[Tuple[str, str]]:
+def read_passport_bytes(image_bytes: bytes) -> Optional[Dict[str, str]]:
+    """Decode an uploaded image and read its MRZ (blocking)"""
+    image = decode_passport_image(image_bytes)
+    if image is None:
+        print("Could not decode passport image.")
+        return None
+    return read_passport_image(image)
+
+def prepare_stream_frame(frame, frame_filter: FrameFilter) -> Tuple[Optional[np.ndarray], Optional[str]]:
     """
-    Reads the MRZ from a passport image and returns the full name.
-    Returns tuple of (given_names, surname) or None if failed
+    Decode a webcam frame (image bytes or base64 text) to grayscale and run the pre-OCR checks (blocking).
+    Returns the image and why it should not be OCR'd, if so; the image is None when the frame cannot be decoded.
+    """
+    if isinstance(frame, str):
+        try:
+            frame = base64.b64decode(frame)
+        except binascii.Error:
+            return None, "undecodable"
+    image = decode_passport_image(frame)
+    if image is None:
+        return None, "undecodable"
+    return image, frame_filter.skip_reason(image)
+
+def read_passport_image(image) -> Optional[Dict[str, str]]:
+    """
+    Reads the MRZ from a passport image (file path or decoded numpy array).
+    Returns dict with names, surname, number, date_of_birth, nationality and valid or None if failed
     """
     try:
-        # Convert numpy array to temporary image file if needed
+        # Hand numpy arrays to passporteye as in-memory PNG bytes
         if isinstance(image, np.ndarray):
-            cv2.imwrite('temp_passport.jpg', image)
-            image_path = 'temp_passport.jpg'
-        else:
-            image_path = image
+            ok, encoded = cv2.imencode('.png', image)
+            if not ok:
+                print("Could not encode passport image.")
+                return None
+            image = encoded.tobytes()
 
         # Read the MRZ from the image
-        mrz = read_mrz(image_path)
-        
-        # Clean up temporary file if it was created
-        if isinstance(image, np.ndarray) and os.path.exists('temp_passport.jpg'):
-            os.remove('temp_passport.jpg')
+        mrz = read_mrz(image)
 
         if mrz is not None:
-            mrz_data = mrz.to_dict()
-            # Clean up the names
-            names = mrz_data['names']
-            names = re.split(r'\s+K', names)[0]  # Remove any K suffix
-            names = names.strip()
-            surname = mrz_data['surname'].strip()
-            return (names, surname)
+            return mrz_fields(mrz)
         else:
             print("MRZ not detected.")
             return None
@@ -95,59 +267,74 @@ def load_sanctions_list(pickle_file='sanctioned_people_simplified.pkl'):
         print(f"Error loading sanctions list: {e}")
         return []
 
-def check_sanctions(name: str, sanctioned_persons) -> Optional[dict]:
+def check_sanctions(name: str, store) -> Optional[SanctionedPerson]:
     """
-    Check if a name appears in the sanctions list
+    Check if a name appears in the sanctions list, regardless of word order
     Returns the sanctioned person's details if found, None otherwise
     """
-    if not name or not sanctioned_persons:
+    if not name:
         return None
-        
-    name = name.lower().strip()
-    for person in sanctioned_persons:
-        # Check main name
-        if person.name and name in person.name.lower():
-            return person
-            
-        # Check aliases
-        for alias_type in ['good_quality', 'low_quality']:
-            for alias in person.aliases.get(alias_type, []):
-                if alias and name in alias.lower():
-                    return person
-    return None
+    matches = store.find_by_name(name)
+    return matches[0] if matches else None
+
+def publish_sanctions_data(persons: List[SanctionedPerson]):
+    """Replace the served sanctions data with a store built for the configured backend"""
+    global SANCTIONS_STORE
+    SANCTIONS_STORE = create_sanctions_store(persons)
+    refresh_name_filter()
+
+def refresh_name_filter():
+    """Load the stored name filter for the served dataset version, or build and store a new one"""
+    global NAME_FILTER
+    try:
+        NAME_FILTER = load_or_build_name_filter(SANCTIONS_STORE, SANCTIONS_STORE.version, NAME_FILTER_FILE)
+    except Exception as e:
+        print(f"Error building name filter, screening without it: {e}")
+        NAME_FILTER = None
+
+def name_may_be_listed(name: str) -> bool:
+    """Negative fast path: False means no listed name or alias can match, without touching the store"""
+    name_filter = NAME_FILTER
+    # Only trust a filter built for the data being served (another worker may have rebuilt the SQLite store)
+    if name_filter is None or name_filter.dataset_version != SANCTIONS_STORE.version:
+        return True
+    return name_filter.might_match(name)
 
 
 def reprocess_sanctions_data():
-    """Reprocess sanctions data from PDFs and update pickle file"""
+    """Reprocess sanctions data from the source files (XML/CSV, or PDFs as fallback) and update pickle file"""
     try:
         print("Starting sanctions data reprocessing...")
         
-        # Process all sanctions lists
-        all_sanctioned_persons = []
-        
-        # Process SDN list
-        if os.path.exists("sdnlist.pdf"):
-            sdn_persons = sdnlist()
-            all_sanctioned_persons.extend(sdn_persons)
-        
-        # Process UN sanctions
-        if os.path.exists("unsanctions.pdf"):
-            un_persons = unsanctionslist()
-            all_sanctioned_persons.extend(un_persons)
-        
-        # Process UAE sanctions
-        uae_pdf = 'Copy of SL_1 (24052021) V.2 (1).pdf'
-        if os.path.exists(uae_pdf):
-            uae_persons = uae_list(uae_pdf)
-            all_sanctioned_persons.extend(uae_persons)
+        # Parse all sources concurrently, each into its own snapshot; failed sources keep their last good one,
+        # and sources without a snapshot yet start from the entries currently served
+        seed_missing_snapshots(SANCTIONS_STORE)
+        refresh_snapshots()
+        all_sanctioned_persons = assemble_latest_snapshots()
+        if not all_sanctioned_persons:
+            print("No sanctions snapshots available, keeping current data.")
+            return False
         
         # Save processed data
         with open(PICKLE_FILE, 'wb') as f:
             pickle.dump(all_sanctioned_persons, f)
         
-        # Update global variable
-        global SANCTIONED_PERSONS
-        SANCTIONED_PERSONS = all_sanctioned_persons
+        # Entity-level diff against the served data, logged per version for /sanctions-changes/.
+        # Nothing is served yet on a first run, so there is no previous version to diff against.
+        previous_version = SANCTIONS_STORE.version
+        diff = diff_datasets(SANCTIONS_STORE, all_sanctioned_persons) if len(SANCTIONS_STORE) else None
+        
+        # Update global data
+        publish_sanctions_data(all_sanctioned_persons)
+        if diff is not None and SANCTIONS_STORE.version != previous_version:
+            record_changes(diff, previous_version, SANCTIONS_STORE.version)
+        
+        # Re-screen previously checked names against added or modified entries only. Without any,
+        # keep the last report: its hits are still unresolved, and with the SQLite backend every
+        # worker but the one that rebuilt the shared database finds no changes.
+        changed = [c["after"] for c in diff["added"] + diff["modified"]] if diff is not None else []
+        if changed:
+            save_rescreen_report(rescreen_changed_entries(changed, SCREENED_NAMES), len(changed))
         
         print(f"Reprocessing complete. Total entries: {len(all_sanctioned_persons)}")
         return True
@@ -156,31 +343,119 @@ def reprocess_sanctions_data():
         return False
 
 def load_sanctioned_data():
-    """Load sanctions data from pickle file"""
-    global SANCTIONED_PERSONS
+    """Load sanctions data from pickle file, or straight from the SQLite store if one exists"""
+    global SANCTIONS_STORE
     try:
-        SANCTIONED_PERSONS = load_sanctions_list(PICKLE_FILE)
-        print(f"Loaded {len(SANCTIONED_PERSONS)} sanctioned persons from pickle file")
+        if SANCTIONS_BACKEND == 'sqlite' and os.path.exists(SANCTIONS_DB_FILE):
+            SANCTIONS_STORE = SqliteSanctionsStore(SANCTIONS_DB_FILE)
+            refresh_name_filter()
+            print(f"Opened SQLite store with {len(SANCTIONS_STORE)} sanctioned persons")
+            return
+        publish_sanctions_data(load_sanctions_list(PICKLE_FILE))
+        print(f"Loaded {len(SANCTIONS_STORE)} sanctioned persons from pickle file")
     except Exception as e:
         print(f"Error loading sanctions data: {e}")
-        SANCTIONED_PERSONS = []
+        publish_sanctions_data([])
 
 # Initialize scheduler
 scheduler = BackgroundScheduler()
 # Set to 1 week interval
 interval = IntervalTrigger(weeks=1)
-scheduler.start()
-scheduler.add_job(reprocess_sanctions_data, interval)
+# Snapshot workers are spawned and re-import this file as __mp_main__ when it is run as a script;
+# they only need the parsers, not the scheduler or the data
+if __name__ != "__mp_main__":
+    scheduler.start()
+    scheduler.add_job(reprocess_sanctions_data, interval)
 
 def initialize_data(force_reprocess: bool = False):
     """Initialize sanctions data, optionally forcing reprocessing"""
     if force_reprocess or not os.path.exists(PICKLE_FILE):
+        # Serve the persisted data first, so the reprocessed data is diffed against what was published
+        if os.path.exists(PICKLE_FILE) or (SANCTIONS_BACKEND == 'sqlite' and os.path.exists(SANCTIONS_DB_FILE)):
+            load_sanctioned_data()
         print("Forcing reprocessing of sanctions data...")
         reprocess_sanctions_data()
     else:
         print("Loading existing sanctions data...")
         load_sanctioned_data()
 
+def match_details_with_links(match: SanctionedPerson, links) -> Dict[str, Any]:
+    """Match details returned by the endpoints that also search adverse media"""
+    return {
+        "name": match.name,
+        "aliases": match.aliases.get('good_quality', []),
+        "source": match.source,
+        "links": links if links else None
+    }
+
+async def search_adverse_media(full_name: str) -> Tuple[Any, bool]:
+    """
+    Search for suspicious links about a name with the configured backend, under admission control.
+    Returns (links, skipped): a saturated scraper or a failed search request skips the search
+    instead of failing the screening.
+    """
+    try:
+        if SEARCH_CLIENT is not None:
+            async with SCRAPE_CLASS.admit():
+                return await SEARCH_CLIENT.find_suspicious_links(full_name), False
+        return await SCRAPE_CLASS.run(find_suspicious_links, full_name), False
+    except (AdmissionRejected, httpx.HTTPError) as e:
+        print(f"Skipping adverse-media search: {e!r}")
+        return None, True
+
+async def screen_name(full_name: str) -> SanctionsCheckResponse:
+    """Check a name against sanctions lists and search for suspicious links, under admission control"""
+    match = None
+    if name_may_be_listed(full_name):
+        match = await LOOKUP_CLASS.run(check_sanctions, full_name, SANCTIONS_STORE)
+    response = SanctionsCheckResponse(
+        success=True,
+        message=f"Successfully checked name: {full_name}",
+        match_found=bool(match)
+    )
+    links, response.adverse_media_skipped = await search_adverse_media(full_name)
+    if match:
+        response.match_details = match_details_with_links(match, links)
+    return response
+
+async def screen_passport(passport: Dict[str, str], search_links: bool) -> SanctionsCheckResponse:
+    """Check passport MRZ data against sanctions lists, optionally searching for suspicious links"""
+    full_name = f"{passport['names']} {passport['surname']}"
+    # Exact document number hits first
+    match = await LOOKUP_CLASS.run(check_passport_sanctions, passport, SANCTIONS_STORE)
+    response = SanctionsCheckResponse(
+        success=True,
+        message=f"Successfully processed passport for: {full_name}",
+        match_found=bool(match)
+    )
+    if search_links:
+        links, response.adverse_media_skipped = await search_adverse_media(full_name)
+        if match:
+            response.match_details = match_details_with_links(match, links)
+    elif match:
+        response.match_details = {
+            "name": match.name,
+            "aliases": match.aliases.get('good_quality', []),
+            "nationality": match.nationality,
+            "dob": match.dob
+        }
+    return response
+
+async def cached_screening(key: Tuple, compute: Callable[[], Awaitable[SanctionsCheckResponse]]) -> SanctionsCheckResponse:
+    """
+    Run a screening at most once per key and dataset version.
+    Identical in-flight requests share one computation; results are kept in an LRU cache,
+    except those missing their adverse-media search, which is retried on the next request.
+    """
+    key = key + (SANCTIONS_STORE.version,)
+    response = await RESPONSE_CACHE.get_or_compute(key, compute, cacheable=lambda r: not r.adverse_media_skipped)
+    return response.copy(deep=True)
+
+def passport_cache_key(endpoint: str, passport: Dict[str, str]) -> Tuple:
+    full_name = f"{passport['names']} {passport['surname']}"
+    return (endpoint, normalize_name(full_name), passport.get('number'), passport.get('date_of_birth'),
+            passport.get('country'))
+
 class Base64Request(BaseModel):
     image_data: str  # Base64 encoded image string
 
@@ -190,43 +465,33 @@ async def check_passport_base64(request: Base64Request):
     Check a passport image from base64 encoded string against sanctions lists
     """
     try:
-        # Decode base64 image
-        image_bytes = base64.b64decode(request.image_data)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode base64 image, accepting data URIs as produced by the webcam component
+        image_data = request.image_data.split(',', 1)[-1]
+        if len(image_data) > MAX_UPLOAD_BYTES * 4 // 3 + 4:
+            raise UploadTooLarge()
+        # Drop the model's reference too, so the base64 text can be freed once it is decoded
+        request.image_data = None
+        image_bytes = base64.b64decode(image_data)
+        del image_data
         
-        # Process passport
-        name_parts = read_passport_image(image)
+        # Decode at reduced resolution and read the MRZ on the OCR pool
+        passport = await OCR_CLASS.run(read_passport_bytes, image_bytes)
         
-        if not name_parts:
+        if not passport:
             return SanctionsCheckResponse(
                 success=True,
                 message="Could not read passport MRZ data",
                 match_found=False
             )
         
-        given_names, surname = name_parts
-        full_name = f"{given_names} {surname}"
+        SCREENED_NAMES.add(f"{passport['names']} {passport['surname']}")
         
         # Check sanctions
-        match = check_sanctions(full_name, SANCTIONED_PERSONS)
-        
-        response = SanctionsCheckResponse(
-            success=True,
-            message=f"Successfully processed passport for: {full_name}",
-            match_found=bool(match)
-        )
-        
-        if match:
-            response.match_details = {
-                "name": match.name,
-                "aliases": match.aliases.get('good_quality', []),
-                "nationality": match.nationality,
-                "dob": match.dob
-            }
-        
-        return response
+        return await cached_screening(passport_cache_key("passport-base64", passport),
+                                      lambda: screen_passport(passport, search_links=False))
         
+    except (UploadTooLarge, AdmissionRejected):
+        raise
     except Exception as e:
         return SanctionsCheckResponse(
             success=False,
@@ -240,52 +505,27 @@ async def check_passport_file(file: UploadFile = File(...)):
     Check a passport image file against sanctions lists
     """
     try:
-        # Read the file
-        contents = await file.read()
-        nparr = np.frombuffer(contents, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Read the file in chunks, up to MAX_UPLOAD_BYTES
+        contents = await read_upload_limited(file)
         
-        # Process passport
-        name_parts = read_passport_image(image)
+        # Decode at reduced resolution and read the MRZ on the OCR pool
+        passport = await OCR_CLASS.run(read_passport_bytes, contents)
         
-        if not name_parts:
+        if not passport:
             return SanctionsCheckResponse(
                 success=True,
                 message="Could not read passport MRZ data",
                 match_found=False
             )
         
-        given_names, surname = name_parts
-        full_name = f"{given_names} {surname}"
-        
-        # Check sanctions
-        match = check_sanctions(full_name, SANCTIONED_PERSONS)
-        
-        response = SanctionsCheckResponse(
-            success=True,
-            message=f"Successfully processed passport for: {full_name}",
-            match_found=bool(match)
-        )
+        SCREENED_NAMES.add(f"{passport['names']} {passport['surname']}")
         
-        links = find_suspicious_links(full_name)
-        if match:
-            if links:
-                response.match_details = {
-                    "name": match.name,
-                    "aliases": match.aliases.get('good_quality', []),
-                    "source": match.source,
-                    "links": links
-                }
-            else:
-                response.match_details = {
-                "name": match.name,
-                "aliases": match.aliases.get('good_quality', []),
-                "source": match.source,
-                "links": None
-                }
-        
-        return response
+        # Check sanctions and search for suspicious links
+        return await cached_screening(passport_cache_key("passport-file", passport),
+                                      lambda: screen_passport(passport, search_links=True))
         
+    except (UploadTooLarge, AdmissionRejected):
+        raise
     except Exception as e:
         return SanctionsCheckResponse(
             success=False,
@@ -293,6 +533,67 @@ async def check_passport_file(file: UploadFile = File(...)):
             match_found=False
         )
     
+@app.websocket("/ws/check-passport-stream/")
+async def check_passport_stream(websocket: WebSocket):
+    """
+    Check a stream of webcam frames until one yields a check-digit-verified MRZ.
+    Each message is one frame, as binary image bytes or a (data URI) base64 string.
+    The server answers every frame with a JSON status, so clients send the next frame after a reply:
+    "skipped" (duplicate, blurry or undecodable frame, not OCR'd), "retry" (no valid MRZ found),
+    then "done" with the usual check result, after which the socket is closed.
+    """
+    await websocket.accept()
+    frame_filter = FrameFilter(min_sharpness=MIN_FRAME_SHARPNESS)
+    try:
+        for _ in range(MAX_STREAM_FRAMES):
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            frame = message.get("bytes")
+            if frame is None:
+                # Base64 text is checked before decoding, like check_passport_base64
+                frame = (message.get("text") or "").split(',', 1)[-1]
+                too_large = len(frame) > MAX_UPLOAD_BYTES * 4 // 3 + 4
+            else:
+                too_large = len(frame) > MAX_UPLOAD_BYTES
+            if too_large:
+                await websocket.send_json({"status": "skipped", "reason": "too_large"})
+                continue
+
+            # Base64 decoding, image decoding and the blur / duplicate checks all run on the OCR pool
+            try:
+                image, skip_reason = await OCR_CLASS.run(prepare_stream_frame, frame, frame_filter)
+            except AdmissionRejected as e:
+                await websocket.send_json({"status": "retry", "reason": "busy", "retry_after": e.retry_after})
+                continue
+            if skip_reason:
+                await websocket.send_json({"status": "skipped", "reason": skip_reason})
+                continue
+
+            try:
+                passport = await OCR_CLASS.run(read_passport_image, image)
+            except AdmissionRejected as e:
+                await websocket.send_json({"status": "retry", "reason": "busy", "retry_after": e.retry_after})
+                continue
+            if not passport or not passport['valid']:
+                await websocket.send_json({"status": "retry", "reason": "invalid_mrz" if passport else "no_mrz"})
+                continue
+
+            SCREENED_NAMES.add(f"{passport['names']} {passport['surname']}")
+            response = await cached_screening(passport_cache_key("passport-base64", passport),
+                                              lambda: screen_passport(passport, search_links=False))
+            await websocket.send_json({"status": "done", "result": response.dict()})
+            await websocket.close()
+            return
+
+        await websocket.send_json({"status": "failed", "reason": "frame_limit"})
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
+    except Exception as e:
+        await websocket.send_json({"status": "failed", "reason": f"Error processing passport: {str(e)}"})
+        await websocket.close()
+    
 class NameCheckRequest(BaseModel):
     full_name: str
 
@@ -302,34 +603,16 @@ async def check_name(request: NameCheckRequest):
     Check a person's full name against sanctions lists
     """
     try:
-        # Check sanctions
-        match = check_sanctions(request.full_name, SANCTIONED_PERSONS)
-        
-        response = SanctionsCheckResponse(
-            success=True,
-            message=f"Successfully checked name: {request.full_name}",
-            match_found=bool(match)
-        )
-        
-        links = find_suspicious_links(request.full_name)
-        if match:
-            if links:
-                response.match_details = {
-                    "name": match.name,
-                    "aliases": match.aliases.get('good_quality', []),
-                    "source": match.source,
-                    "links": links
-                }
-            else:
-                response.match_details = {
-                "name": match.name,
-                "aliases": match.aliases.get('good_quality', []),
-                "source": match.source,
-                "links": None
-                }
+        SCREENED_NAMES.add(request.full_name)
         
+        # Check sanctions and search for suspicious links
+        response = await cached_screening(("name", normalize_name(request.full_name)),
+                                          lambda: screen_name(request.full_name))
+        response.message = f"Successfully checked name: {request.full_name}"
         return response
         
+    except AdmissionRejected:
+        raise
     except Exception as e:
         return SanctionsCheckResponse(
             success=False,
@@ -346,6 +629,39 @@ async def trigger_reprocess(background_tasks: BackgroundTasks):
     return {"message": "Reprocessing started in background"}
 
 
+@app.get("/rescreen-report/")
+async def get_rescreen_report():
+    """
+    Get the new hits found by re-screening known names after the last list refresh
+    """
+    try:
+        return load_rescreen_report()
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+@app.get("/sanctions-changes/")
+async def get_sanctions_changes(since: Optional[str] = None):
+    """
+    Get the entries added, removed or modified since a dataset version (default: the last refresh)
+    """
+    try:
+        changes = changes_since(since)
+        if changes is None:
+            return {
+                "status": "error",
+                "message": f"Version '{since}' is not in the change history, reload the full list",
+                "current_version": SANCTIONS_STORE.version
+            }
+        return changes
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
 @app.get("/sanctions-status/")
 async def get_sanctions_status():
     """
@@ -355,7 +671,12 @@ async def get_sanctions_status():
         last_modified = datetime.fromtimestamp(os.path.getmtime(PICKLE_FILE))
         return {
             "status": "active",
-            "total_entries": len(SANCTIONED_PERSONS),
+            "total_entries": len(SANCTIONS_STORE),
+            "dataset_version": SANCTIONS_STORE.version,
+            "response_cache": RESPONSE_CACHE.stats(),
+            "name_filter": NAME_FILTER.stats() if NAME_FILTER is not None else None,
+            "admission": {c.name: c.stats() for c in (LOOKUP_CLASS, OCR_CLASS, SCRAPE_CLASS)},
+            "sources": {source: latest_snapshot_info(source) for source in SOURCE_FILES},
             "last_updated": last_modified.isoformat()
         }
     except Exception as e:
@@ -377,6 +698,6 @@ if __name__ == "__main__":
     # Start the API server
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
-else:
+elif __name__ != "__mp_main__":
     # When imported as a module (e.g., by uvicorn), just load the data
     initialize_data(False)
\ No newline at end of file
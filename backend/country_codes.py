@@ -0,0 +1,244 @@
+import re
+from typing import Dict, Optional, Set, Tuple
+
+# ICAO 9303 issuing state / nationality codes (ISO 3166-1 alpha-3 plus the ICAO-only codes)
+# -> lowercase country names as they are written on the sanctions lists
+COUNTRY_NAMES: Dict[str, Tuple[str, ...]] = {
+    'AFG': ('afghanistan',),
+    'ALB': ('albania',),
+    'DZA': ('algeria',),
+    'AND': ('andorra',),
+    'AGO': ('angola',),
+    'ATG': ('antigua and barbuda', 'antigua'),
+    'ARG': ('argentina',),
+    'ARM': ('armenia',),
+    'AUS': ('australia',),
+    'AUT': ('austria',),
+    'AZE': ('azerbaijan',),
+    'BHS': ('bahamas',),
+    'BHR': ('bahrain',),
+    'BGD': ('bangladesh',),
+    'BRB': ('barbados',),
+    'BLR': ('belarus',),
+    'BEL': ('belgium',),
+    'BLZ': ('belize',),
+    'BEN': ('benin',),
+    'BTN': ('bhutan',),
+    'BOL': ('bolivia',),
+    'BIH': ('bosnia and herzegovina', 'bosnia-herzegovina', 'bosnia'),
+    'BWA': ('botswana',),
+    'BRA': ('brazil',),
+    'BRN': ('brunei', 'brunei darussalam'),
+    'BGR': ('bulgaria',),
+    'BFA': ('burkina faso',),
+    'BDI': ('burundi',),
+    'CPV': ('cabo verde', 'cape verde'),
+    'KHM': ('cambodia',),
+    'CMR': ('cameroon',),
+    'CAN': ('canada',),
+    'CAF': ('central african republic',),
+    'TCD': ('chad',),
+    'CHL': ('chile',),
+    'CHN': ('china',),
+    'COL': ('colombia',),
+    'COM': ('comoros',),
+    'COG': ('congo, republic of the', 'republic of the congo', 'congo-brazzaville'),
+    'COD': ('congo, democratic republic of the', 'democratic republic of the congo', 'drc', 'congo-kinshasa'),
+    'CRI': ('costa rica',),
+    'CIV': ("cote d'ivoire", "côte d'ivoire", 'ivory coast'),
+    'HRV': ('croatia',),
+    'CUB': ('cuba',),
+    'CYP': ('cyprus',),
+    'CZE': ('czech republic', 'czechia'),
+    'DNK': ('denmark',),
+    'DJI': ('djibouti',),
+    'DMA': ('dominica',),
+    'DOM': ('dominican republic',),
+    'ECU': ('ecuador',),
+    'EGY': ('egypt',),
+    'SLV': ('el salvador',),
+    'GNQ': ('equatorial guinea',),
+    'ERI': ('eritrea',),
+    'EST': ('estonia',),
+    'SWZ': ('eswatini', 'swaziland'),
+    'ETH': ('ethiopia',),
+    'FJI': ('fiji',),
+    'FIN': ('finland',),
+    'FRA': ('france',),
+    'GAB': ('gabon',),
+    'GMB': ('gambia',),
+    'GEO': ('georgia',),
+    'D': ('germany',),
+    'DEU': ('germany',),
+    'GHA': ('ghana',),
+    'GRC': ('greece',),
+    'GRD': ('grenada',),
+    'GTM': ('guatemala',),
+    'GIN': ('guinea',),
+    'GNB': ('guinea-bissau', 'guinea bissau'),
+    'GUY': ('guyana',),
+    'HTI': ('haiti',),
+    'HND': ('honduras',),
+    'HKG': ('hong kong',),
+    'HUN': ('hungary',),
+    'ISL': ('iceland',),
+    'IND': ('india',),
+    'IDN': ('indonesia',),
+    'IRN': ('iran',),
+    'IRQ': ('iraq',),
+    'IRL': ('ireland',),
+    'ISR': ('israel',),
+    'ITA': ('italy',),
+    'JAM': ('jamaica',),
+    'JPN': ('japan',),
+    'JOR': ('jordan',),
+    'KAZ': ('kazakhstan',),
+    'KEN': ('kenya',),
+    'KIR': ('kiribati',),
+    'PRK': ("democratic people's republic of korea", 'korea, north', 'north korea', 'dprk'),
+    'KOR': ('korea, south', 'south korea', 'korea, republic of'),
+    'RKS': ('kosovo',),
+    'KWT': ('kuwait',),
+    'KGZ': ('kyrgyzstan',),
+    'LAO': ('laos', "lao people's democratic republic"),
+    'LVA': ('latvia',),
+    'LBN': ('lebanon',),
+    'LSO': ('lesotho',),
+    'LBR': ('liberia',),
+    'LBY': ('libya',),
+    'LIE': ('liechtenstein',),
+    'LTU': ('lithuania',),
+    'LUX': ('luxembourg',),
+    'MAC': ('macau', 'macao'),
+    'MDG': ('madagascar',),
+    'MWI': ('malawi',),
+    'MYS': ('malaysia',),
+    'MDV': ('maldives',),
+    'MLI': ('mali',),
+    'MLT': ('malta',),
+    'MHL': ('marshall islands',),
+    'MRT': ('mauritania',),
+    'MUS': ('mauritius',),
+    'MEX': ('mexico',),
+    'FSM': ('micronesia',),
+    'MDA': ('moldova',),
+    'MCO': ('monaco',),
+    'MNG': ('mongolia',),
+    'MNE': ('montenegro',),
+    'MAR': ('morocco',),
+    'MOZ': ('mozambique',),
+    'MMR': ('myanmar', 'burma'),
+    'NAM': ('namibia',),
+    'NRU': ('nauru',),
+    'NPL': ('nepal',),
+    'NLD': ('netherlands',),
+    'NZL': ('new zealand',),
+    'NIC': ('nicaragua',),
+    'NER': ('niger',),
+    'NGA': ('nigeria',),
+    'MKD': ('north macedonia', 'macedonia'),
+    'NOR': ('norway',),
+    'OMN': ('oman',),
+    'PAK': ('pakistan',),
+    'PLW': ('palau',),
+    'PSE': ('palestine', 'palestinian', 'west bank', 'gaza'),
+    'PAN': ('panama',),
+    'PNG': ('papua new guinea',),
+    'PRY': ('paraguay',),
+    'PER': ('peru',),
+    'PHL': ('philippines',),
+    'POL': ('poland',),
+    'PRT': ('portugal',),
+    'QAT': ('qatar',),
+    'ROU': ('romania',),
+    'RUS': ('russia', 'russian federation'),
+    'RWA': ('rwanda',),
+    'KNA': ('saint kitts and nevis', 'st. kitts and nevis'),
+    'LCA': ('saint lucia', 'st. lucia'),
+    'VCT': ('saint vincent and the grenadines', 'st. vincent and the grenadines'),
+    'WSM': ('samoa',),
+    'SMR': ('san marino',),
+    'STP': ('sao tome and principe',),
+    'SAU': ('saudi arabia',),
+    'SEN': ('senegal',),
+    'SRB': ('serbia',),
+    'SYC': ('seychelles',),
+    'SLE': ('sierra leone',),
+    'SGP': ('singapore',),
+    'SVK': ('slovakia',),
+    'SVN': ('slovenia',),
+    'SLB': ('solomon islands',),
+    'SOM': ('somalia',),
+    'ZAF': ('south africa',),
+    'SSD': ('south sudan',),
+    'ESP': ('spain',),
+    'LKA': ('sri lanka',),
+    'SDN': ('sudan',),
+    'SUR': ('suriname',),
+    'SWE': ('sweden',),
+    'CHE': ('switzerland',),
+    'SYR': ('syria', 'syrian arab republic'),
+    'TWN': ('taiwan',),
+    'TJK': ('tajikistan',),
+    'TZA': ('tanzania',),
+    'THA': ('thailand',),
+    'TLS': ('timor-leste', 'east timor'),
+    'TGO': ('togo',),
+    'TON': ('tonga',),
+    'TTO': ('trinidad and tobago',),
+    'TUN': ('tunisia',),
+    'TUR': ('turkey', 'türkiye', 'turkiye'),
+    'TKM': ('turkmenistan',),
+    'TUV': ('tuvalu',),
+    'UGA': ('uganda',),
+    'UKR': ('ukraine',),
+    'ARE': ('united arab emirates', 'uae'),
+    'GBR': ('united kingdom', 'great britain', 'uk'),
+    'GBD': ('united kingdom',),
+    'GBN': ('united kingdom',),
+    'GBO': ('united kingdom',),
+    'GBP': ('united kingdom',),
+    'GBS': ('united kingdom',),
+    'USA': ('united states', 'usa', 'u.s.'),
+    'URY': ('uruguay',),
+    'UZB': ('uzbekistan',),
+    'VUT': ('vanuatu',),
+    'VAT': ('holy see', 'vatican'),
+    'VEN': ('venezuela',),
+    'VNM': ('vietnam', 'viet nam'),
+    'YEM': ('yemen',),
+    'ZMB': ('zambia',),
+    'ZWE': ('zimbabwe',),
+}
+
+# Country name -> codes, e.g. 'germany' -> {'D', 'DEU'}
+_CODES_BY_NAME: Dict[str, Set[str]] = {}
+for _code, _names in COUNTRY_NAMES.items():
+    for _name in _names:
+        _CODES_BY_NAME.setdefault(_name, set()).add(_code)
+
+# Every country name as a whole word, longest first: at each position the longest name wins,
+# so "South Sudan" is not read as Sudan nor "Democratic People's Republic of Korea" as South Korea
+_COUNTRY_NAME_PATTERN = re.compile(
+    r'(?<![\w.])(' + '|'.join(re.escape(name) for name in sorted(_CODES_BY_NAME, key=len, reverse=True)) + r')(?!\w)')
+
+
+def normalize_country_code(code: Optional[str]) -> str:
+    """MRZ code without filler, e.g. 'D<<' -> 'D'."""
+    return (code or '').replace('<', '').strip().upper()
+
+
+def countries_mentioned(text: Optional[str]) -> Set[str]:
+    """Codes of every country named in a free-text field, e.g. {'AFG'} for "OR 123456 (Afghanistan)"."""
+    if not text:
+        return set()
+    codes = set()
+    for name in _COUNTRY_NAME_PATTERN.findall(' '.join(text.lower().split())):
+        codes |= _CODES_BY_NAME[name]
+    return codes
+
+
+def country_mentioned(code: Optional[str], text: Optional[str]) -> bool:
+    """True if the country of an MRZ issuing state / nationality code is named in the text."""
+    code = normalize_country_code(code)
+    return bool(code) and code in countries_mentioned(text)
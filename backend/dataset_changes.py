@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sanction_search_v2 import SanctionedPerson, normalize_name, person_fingerprint
+
+# Folder holding one change set per published version plus the ordered version history
+CHANGES_DIR = 'changes'
+HISTORY_FILE = 'history.json'
+# Change sets kept; older versions can only be caught up with a full reload
+HISTORY_TO_KEEP = 52
+
+
+def keyed_entries(persons: Iterable[SanctionedPerson]) -> Dict[str, SanctionedPerson]:
+    """
+    Maps each entry to a stable identity key: the list ID when there is one, otherwise the
+    normalized name, both scoped by source. Repeated keys get an occurrence suffix (#2, #3...).
+    """
+    keyed = {}
+    for person in persons:
+        base = f"{person.source}:{person.id or normalize_name(person.name)}"
+        key, occurrence = base, 1
+        while key in keyed:
+            occurrence += 1
+            key = f"{base}#{occurrence}"
+        keyed[key] = person
+    return keyed
+
+
+def diff_datasets(old_persons: Iterable[SanctionedPerson],
+                  new_persons: Iterable[SanctionedPerson]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Set-based diff of two datasets by identity key and content fingerprint.
+    Returns added / removed / modified lists of {"key", "before", "after"} with the persons themselves.
+    """
+    old = keyed_entries(old_persons)
+    new = keyed_entries(new_persons)
+    added = [{"key": k, "before": None, "after": new[k]} for k in new.keys() - old.keys()]
+    removed = [{"key": k, "before": old[k], "after": None} for k in old.keys() - new.keys()]
+    modified = [{"key": k, "before": old[k], "after": new[k]} for k in old.keys() & new.keys()
+                if person_fingerprint(old[k]) != person_fingerprint(new[k])]
+    return {
+        "added": sorted(added, key=lambda c: c["key"]),
+        "removed": sorted(removed, key=lambda c: c["key"]),
+        "modified": sorted(modified, key=lambda c: c["key"]),
+    }
+
+
+def _serialize(change: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "key": change["key"],
+        "before": asdict(change["before"]) if change["before"] is not None else None,
+        "after": asdict(change["after"]) if change["after"] is not None else None,
+    }
+
+
+def _write_json(path: str, data: Any, **dump_args):
+    """
+    Writes JSON to a unique temporary file next to path and renames it into place, so workers
+    recording the same version never share a temporary file and readers never see a partial file.
+    """
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(path) + '.',
+                                     dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **dump_args)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_history(changes_dir: str = CHANGES_DIR) -> List[Dict[str, Any]]:
+    """Published versions, oldest first."""
+    path = os.path.join(changes_dir, HISTORY_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def record_changes(diff: Dict[str, List[Dict[str, Any]]], previous_version: str, version: str,
+                   changes_dir: str = CHANGES_DIR) -> Dict[str, Any]:
+    """Stores the change set leading to `version` and appends it to the version history."""
+    os.makedirs(changes_dir, exist_ok=True)
+    change_set = {
+        "version": version,
+        "previous_version": previous_version,
+        "created_at": datetime.now().isoformat(),
+        "added": [_serialize(c) for c in diff["added"]],
+        "removed": [_serialize(c) for c in diff["removed"]],
+        "modified": [_serialize(c) for c in diff["modified"]],
+    }
+    _write_json(os.path.join(changes_dir, f"{version}.json"), change_set, ensure_ascii=False)
+
+    history = [h for h in load_history(changes_dir) if h["version"] != version]
+    history.append({
+        "version": version,
+        "previous_version": previous_version,
+        "created_at": change_set["created_at"],
+        "added": len(diff["added"]),
+        "removed": len(diff["removed"]),
+        "modified": len(diff["modified"]),
+    })
+    for expired in history[:-HISTORY_TO_KEEP]:
+        try:
+            os.remove(os.path.join(changes_dir, f"{expired['version']}.json"))
+        except OSError:
+            pass
+    history = history[-HISTORY_TO_KEEP:]
+    _write_json(os.path.join(changes_dir, HISTORY_FILE), history, indent=2)
+    print(f"Recorded changes {previous_version} -> {version}: {len(diff['added'])} added, "
+          f"{len(diff['removed'])} removed, {len(diff['modified'])} modified.")
+    return change_set
+
+
+def changes_since(version: Optional[str], changes_dir: str = CHANGES_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Net change set from `version` to the latest recorded version, composed from the stored
+    change sets. Without a version, returns the latest change set. Returns None when the
+    version is not in the history, in which case the consumer has to reload the full list.
+    """
+    history = load_history(changes_dir)
+    if not history:
+        return None
+    if version is None:
+        start = len(history) - 1
+        version = history[-1]["previous_version"]
+    elif version == history[-1]["version"]:
+        start = len(history)
+    else:
+        start = next((i for i, h in enumerate(history) if h["previous_version"] == version), None)
+        if start is None:
+            return None
+
+    # Keep the first "before" and the last "after" seen per key
+    net: Dict[str, Dict[str, Any]] = {}
+    for entry in history[start:]:
+        with open(os.path.join(changes_dir, f"{entry['version']}.json"), 'r', encoding='utf-8') as f:
+            change_set = json.load(f)
+        for change in change_set["added"] + change_set["removed"] + change_set["modified"]:
+            if change["key"] in net:
+                net[change["key"]]["after"] = change["after"]
+            else:
+                net[change["key"]] = dict(change)
+
+    result = {"from_version": version, "to_version": history[-1]["version"],
+              "added": [], "removed": [], "modified": []}
+    for change in sorted(net.values(), key=lambda c: c["key"]):
+        if change["before"] is None and change["after"] is not None:
+            result["added"].append(change)
+        elif change["before"] is not None and change["after"] is None:
+            result["removed"].append(change)
+        elif change["before"] != change["after"]:
+            result["modified"].append(change)
+    return result
@@ -0,0 +1,54 @@
+from collections import deque
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Frames are scored at this width, which is plenty for blur and similarity checks
+ANALYSIS_WIDTH = 640
+
+
+def _downscale(gray: np.ndarray, width: int = ANALYSIS_WIDTH) -> np.ndarray:
+    if gray.shape[1] <= width:
+        return gray
+    height = max(1, int(gray.shape[0] * width / gray.shape[1]))
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+
+def difference_hash(gray: np.ndarray, hash_size: int = 8) -> int:
+    """64-bit perceptual hash: sign of the horizontal gradient on a (hash_size + 1) x hash_size thumbnail."""
+    thumbnail = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def laplacian_variance(gray: np.ndarray) -> float:
+    """Focus measure, low for blurry frames."""
+    return float(cv2.Laplacian(_downscale(gray), cv2.CV_64F).var())
+
+
+class FrameFilter:
+    """
+    Cheap pre-OCR checks for a stream of webcam frames.
+    A frame is skipped when it is too blurry, or when its perceptual hash is within
+    `min_hash_distance` bits of one of the last frames that were sent to OCR.
+    """
+
+    def __init__(self, min_sharpness: float = 100.0, min_hash_distance: int = 4, history: int = 5):
+        self.min_sharpness = min_sharpness
+        self.min_hash_distance = min_hash_distance
+        self._recent_hashes = deque(maxlen=history)
+
+    def skip_reason(self, gray: np.ndarray) -> Optional[str]:
+        """Returns why the frame should be skipped, or None (and remembers it) if it is worth OCR."""
+        frame_hash = difference_hash(gray)
+        if any(hamming_distance(frame_hash, h) < self.min_hash_distance for h in self._recent_hashes):
+            return "duplicate"
+        if laplacian_variance(gray) < self.min_sharpness:
+            return "blurry"
+        self._recent_hashes.append(frame_hash)
+        return None
@@ -0,0 +1,303 @@
+"""
+Local load-testing harness for the Sanctions Check API.
+
+Starts `api:app` under uvicorn in a scratch directory holding a synthetic sanctions snapshot,
+with `find_suspicious_links` replaced by a stand-in that only sleeps (--scraper stub), or with the
+HTTP search backend pointed at a local stand-in search server (--scraper http), then drives the screening
+endpoints with a configurable concurrency and traffic mix and reports throughput and latency
+percentiles. A background probe hits /sanctions-status/ throughout the run: if its latency
+climbs with load, something is blocking the event loop.
+
+    python loadtest.py --server-workers 2 --concurrency 32 --duration 30 --mix name=8,file=1,base64=1
+"""
+import argparse
+import asyncio
+import base64
+import html
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import cv2
+import httpx
+import numpy as np
+
+from sanction_search_v2 import SanctionedPerson
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+GIVEN_NAMES = ['AHMED', 'ALI', 'ANNA', 'BORIS', 'CHEN', 'DAVID', 'ELENA', 'FATIMA', 'HASSAN', 'IVAN',
+               'JOSE', 'KIM', 'LEILA', 'MARIA', 'MOHAMMAD', 'NADIA', 'OMAR', 'PETER', 'SARA', 'YUSUF']
+SURNAMES = ['ABDULLAH', 'ALVAREZ', 'BAKER', 'BASIR', 'DIAZ', 'HUSSEIN', 'IVANOV', 'KARIMI', 'KHAN', 'LEE',
+            'MORALES', 'NGUYEN', 'PETROV', 'RAHMAN', 'SALEH', 'SMIRNOV', 'TAHERI', 'WANG', 'YILMAZ', 'ZHANG']
+# Message of the passport endpoints' 200 response when no MRZ could be read from the image
+UNREAD_MRZ_MESSAGE = "Could not read passport MRZ data"
+
+
+# --- Server side ---
+
+def create_app():
+    """uvicorn factory: imports the API inside the scratch directory with the scraper stand-in installed."""
+    os.chdir(os.environ['LOADTEST_WORKDIR'])
+    scrape_latency = float(os.environ.get('LOADTEST_SCRAPE_LATENCY', '0.5'))
+
+    import api
+    if api.SEARCH_CLIENT is not None:
+        return api.app
+
+    def fake_find_suspicious_links(person_name):
+        time.sleep(scrape_latency)  # Blocking, like the Selenium scraper
+        return []
+
+    api.find_suspicious_links = fake_find_suspicious_links
+    return api.app
+
+
+def create_search_standin():
+    """uvicorn factory: a stand-in search engine serving Google-style result pages after a delay."""
+    from fastapi import FastAPI
+    from fastapi.responses import HTMLResponse
+
+    latency = float(os.environ.get('LOADTEST_SCRAPE_LATENCY', '0.5'))
+    standin = FastAPI()
+
+    @standin.get('/search', response_class=HTMLResponse)
+    async def search(q: str, start: int = 0):
+        await asyncio.sleep(latency)
+        return standin_results_page(q, start)
+
+    return standin
+
+
+def standin_results_page(query: str, start: int, results_per_page: int = 10, total_results: int = 20) -> str:
+    blocks = []
+    for i in range(start, min(start + results_per_page, total_results)):
+        blocks.append(
+            f'<div class="MjjYud"><div class="g"><a href="/url?q=https://news.example.com/{i}&amp;sa=U">'
+            f'<h3>Result {i} for {html.escape(query)}</h3></a>'
+            f'<div class="VwiC3b"><span>Report {i} mentioning {html.escape(query)} and sanctions.</span></div></div></div>')
+    return f"<html><body><div id=\"search\">{''.join(blocks)}</div></body></html>"
+
+
+def synthetic_name(rng: random.Random) -> str:
+    return ' '.join([rng.choice(GIVEN_NAMES), rng.choice(GIVEN_NAMES), rng.choice(SURNAMES), str(rng.randint(1, 99999))])
+
+
+def write_synthetic_snapshot(path: str, entries: int, seed: int = 0) -> List[str]:
+    """Writes a pickle of random SanctionedPersons and returns their names."""
+    rng = random.Random(seed)
+    persons = []
+    for i in range(entries):
+        persons.append(SanctionedPerson(
+            id=f"LT.{i}", name=synthetic_name(rng), original_name=None, title=None, designation=[],
+            dob=str(rng.randint(1940, 2000)), aliases={'good_quality': [synthetic_name(rng)], 'low_quality': []},
+            nationality=None, passport_no=f"P{rng.randint(10**7, 10**8 - 1)}", national_id=None, source="LOADTEST"
+        ))
+    with open(path, 'wb') as f:
+        pickle.dump(persons, f)
+    return [p.name for p in persons]
+
+
+def _mrz_check_digit(value: str) -> str:
+    weights = [7, 3, 1]
+    total = 0
+    for i, char in enumerate(value):
+        if char.isdigit():
+            v = int(char)
+        elif char.isalpha():
+            v = ord(char) - ord('A') + 10
+        else:
+            v = 0
+        total += v * weights[i % 3]
+    return str(total % 10)
+
+
+def synthetic_passport_image() -> bytes:
+    """JPEG of a blank passport page with a rendered TD3 MRZ with valid check digits."""
+    number, dob, expiry = 'L898902C3', '740812', '120415'
+    line1 = 'P<UTOERIKSSON<<ANNA<MARIA'.ljust(44, '<')
+    body = f"{number}{_mrz_check_digit(number)}UTO{dob}{_mrz_check_digit(dob)}F{expiry}{_mrz_check_digit(expiry)}"
+    body = body + 'ZE184226B'.ljust(14, '<') + '1'
+    composite = body[0:10] + body[13:20] + body[21:43]
+    line2 = body + _mrz_check_digit(composite)
+    image = np.full((900, 1300), 235, np.uint8)
+    for y, line in ((760, line1), (830, line2)):
+        cv2.putText(image, line, (40, y), cv2.FONT_HERSHEY_PLAIN, 2.1, 0, 2, cv2.LINE_AA)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def start_server(workdir: str, port: int, server_workers: int, scrape_latency: float,
+                 extra_env: Optional[Dict[str, str]] = None, factory: str = 'loadtest:create_app') -> subprocess.Popen:
+    env = dict(os.environ, LOADTEST_WORKDIR=workdir, LOADTEST_SCRAPE_LATENCY=str(scrape_latency), **(extra_env or {}))
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', factory, '--factory', '--app-dir', BACKEND_DIR,
+         '--host', '127.0.0.1', '--port', str(port), '--workers', str(server_workers), '--log-level', 'warning'],
+        env=env, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_ready(base_url: str, timeout: float = 120, path: str = '/sanctions-status/'):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(path)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout}s")
+
+
+# --- Client side ---
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parses 'name=8,file=1,base64=1' into endpoint weights."""
+    weights = {}
+    for part in mix.split(','):
+        kind, _, weight = part.partition('=')
+        if kind not in ('name', 'file', 'base64'):
+            raise ValueError(f"Unknown endpoint '{kind}' in traffic mix")
+        weights[kind] = float(weight or 1)
+    return weights
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float('nan')
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def response_ok(kind: str, body: Dict) -> bool:
+    """
+    Whether a 200 response actually screened something: the endpoints report errors with
+    success false, and the passport endpoints answer an unreadable MRZ with success true.
+    """
+    if body.get('success') is False:
+        return False
+    return kind == 'name' or body.get('message') != UNREAD_MRZ_MESSAGE
+
+
+async def run_load(base_url: str, names: List[str], mix: Dict[str, float], concurrency: int,
+                   duration: float, hit_ratio: float, passport_image: bytes, seed: int = 0):
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    probe_latencies = []
+    image_b64 = base64.b64encode(passport_image).decode()
+    kinds, weights = list(mix), list(mix.values())
+    rng = random.Random(seed)
+    deadline = time.monotonic() + duration
+
+    async def send(client: httpx.AsyncClient, kind: str):
+        if kind == 'name':
+            name = rng.choice(names) if rng.random() < hit_ratio else synthetic_name(rng)
+            return await client.post('/check-name/', json={'full_name': name})
+        if kind == 'file':
+            return await client.post('/check-passport-file/', files={'file': ('passport.jpg', passport_image, 'image/jpeg')})
+        return await client.post('/check-passport-base64/', json={'image_data': image_b64})
+
+    async def worker(client: httpx.AsyncClient):
+        while time.monotonic() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await send(client, kind)
+                ok = response.status_code == 200 and response_ok(kind, response.json())
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            latencies[kind].append(time.perf_counter() - start)
+            if not ok:
+                failures[kind] += 1
+
+    async def probe(client: httpx.AsyncClient):
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                await client.get('/sanctions-status/')
+                probe_latencies.append(time.perf_counter() - start)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=300) as client:
+        started = time.perf_counter()
+        await asyncio.gather(probe(client), *(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, failures, probe_latencies, elapsed
+
+
+def print_report(latencies, failures, probe_latencies, elapsed: float):
+    print(f"\n{'endpoint':<22}{'requests':>9}{'failed':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    rows = dict(latencies)
+    rows['all'] = [v for values in latencies.values() for v in values]
+    rows['status probe'] = probe_latencies
+    for kind, values in rows.items():
+        values = sorted(values)
+        failed = sum(failures.values()) if kind == 'all' else failures.get(kind, 0)
+        print(f"{kind:<22}{len(values):>9}{failed:>8}{len(values) / elapsed:>9.1f}"
+              f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 95) * 1000:>9.1f}{percentile(values, 99) * 1000:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Sanctions Check API')
+    parser.add_argument('--server-workers', type=int, default=1, help='uvicorn worker processes')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--mix', default='name=8,file=1,base64=1', help='Traffic mix as endpoint=weight pairs')
+    parser.add_argument('--entries', type=int, default=20000, help='Synthetic sanctions entries')
+    parser.add_argument('--hit-ratio', type=float, default=0.1, help='Share of name checks for listed names')
+    parser.add_argument('--scraper', choices=['stub', 'http'], default='stub',
+                        help='stub: sleep instead of scraping; http: HTTP search backend against a stand-in search server')
+    parser.add_argument('--scrape-latency', type=float, default=0.5,
+                        help='Seconds the scraper stand-in sleeps, or the stand-in search server takes per result page')
+    parser.add_argument('--passport-image', help='Passport image to upload instead of the synthetic one')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--url', help='Load an already running server instead of starting one')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    if args.passport_image:
+        with open(args.passport_image, 'rb') as f:
+            passport_image = f.read()
+    else:
+        passport_image = synthetic_passport_image()
+
+    with tempfile.TemporaryDirectory(prefix='sanctions_loadtest_') as workdir:
+        names = write_synthetic_snapshot(os.path.join(workdir, 'sanctioned_people_simplified.pkl'), args.entries)
+        servers = []
+        base_url = args.url
+        if not base_url:
+            base_url = f"http://127.0.0.1:{args.port}"
+            extra_env = {}
+            if args.scraper == 'http':
+                search_port = args.port + 1
+                servers.append(start_server(workdir, search_port, 1, args.scrape_latency,
+                                            factory='loadtest:create_search_standin'))
+                extra_env = {'SCRAPER_BACKEND': 'http',
+                             'SEARCH_URL_TEMPLATE': f"http://127.0.0.1:{search_port}/search?q={{query}}&start={{start}}"}
+            servers.append(start_server(workdir, args.port, args.server_workers, args.scrape_latency, extra_env))
+        try:
+            if args.scraper == 'http' and not args.url:
+                asyncio.run(wait_until_ready(f"http://127.0.0.1:{args.port + 1}", path='/search?q=ready&start=20'))
+            asyncio.run(wait_until_ready(base_url))
+            print(f"Running {args.duration:.0f}s at concurrency {args.concurrency} against {base_url} "
+                  f"({args.server_workers} worker(s), mix {args.mix}, {args.scraper} scraper)...")
+            results = asyncio.run(run_load(base_url, names, mix, args.concurrency, args.duration,
+                                           args.hit_ratio, passport_image))
+            print_report(*results)
+        finally:
+            for server in servers:
+                server.terminate()
+                server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import os
+import pickle
+import tempfile
+from itertools import combinations
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from sanction_search_v2 import SanctionedPerson, person_names
+from sanction_index import name_signature
+
+# Target false-positive rate per key of the name pre-filter
+BLOOM_FP_RATE = float(os.environ.get('BLOOM_FP_RATE', '0.01'))
+# Bumped whenever the keys stored in the filter change, so older filter files are rebuilt
+FILTER_FORMAT = 2
+
+
+def token_pair(first: str, second: str) -> str:
+    """Order-independent key for two tokens of the same name."""
+    return '\x00'.join(sorted((first, second)))
+
+
+def filter_keys(name: str) -> Iterator[str]:
+    """Every token of a name and every unordered pair of its tokens."""
+    tokens = sorted(name_signature(name))
+    yield from tokens
+    for first, second in combinations(tokens, 2):
+        yield token_pair(first, second)
+
+
+class BloomFilter:
+    """
+    Bloom filter over the tokens and token pairs of the names and aliases of a dataset version.
+    A one-token name can only match (see TokenSetIndex.find) a listed name containing that
+    token. A longer name either has all its tokens in a listed name or contains all tokens of a
+    listed name of two or more tokens, so either way two of its tokens occur together in one
+    listed name. A name failing that check is certainly clean. Keys are hashed once with
+    blake2b and the bit positions derived by double hashing.
+    """
+
+    def __init__(self, expected_items: int, fp_rate: float = BLOOM_FP_RATE, dataset_version: Optional[str] = None):
+        n = max(expected_items, 1)
+        self.fp_rate = fp_rate
+        self.dataset_version = dataset_version
+        self.num_bits = max(8, math.ceil(-n * math.log(fp_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / n * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.items = 0
+        self.checks = 0
+        self.rejected = 0
+
+    def _hashes(self, token: str):
+        digest = hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, key: str):
+        h1, h2 = self._hashes(key)
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % self.num_bits
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.items += 1
+
+    def __contains__(self, key: str) -> bool:
+        h1, h2 = self._hashes(key)
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def might_match(self, name: str) -> bool:
+        """
+        False only when the name cannot match: for one token, when it is in no listed name or alias;
+        for more tokens, when no two of them occur together in one listed name or alias.
+        """
+        self.checks += 1
+        tokens = sorted(name_signature(name))
+        if len(tokens) == 1:
+            found = tokens[0] in self
+        else:
+            found = any(token_pair(first, second) in self for first, second in combinations(tokens, 2))
+        if found:
+            return True
+        self.rejected += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        fill_ratio = bin(int.from_bytes(self.bits, 'little')).count('1') / self.num_bits
+        return {
+            "dataset_version": self.dataset_version,
+            "keys": self.items,
+            "size_bytes": len(self.bits),
+            "hashes": self.num_hashes,
+            "target_fp_rate": self.fp_rate,
+            "estimated_fp_rate": round(fill_ratio ** self.num_hashes, 6),
+            "checks": self.checks,
+            "rejected": self.rejected,
+        }
+
+
+def build_name_filter(persons: Iterable[SanctionedPerson], dataset_version: str,
+                      fp_rate: float = BLOOM_FP_RATE) -> BloomFilter:
+    """Bloom filter over the distinct tokens and token pairs of every name and alias."""
+    keys = set()
+    for person in persons:
+        for name in person_names(person):
+            keys.update(filter_keys(name))
+    name_filter = BloomFilter(len(keys), fp_rate, dataset_version)
+    for key in keys:
+        name_filter.add(key)
+    return name_filter
+
+
+def save_name_filter(name_filter: BloomFilter, filename: str):
+    """Stores the filter's parameters and bits next to the dataset it was built from."""
+    state = {
+        "format": FILTER_FORMAT,
+        "dataset_version": name_filter.dataset_version,
+        "fp_rate": name_filter.fp_rate,
+        "num_bits": name_filter.num_bits,
+        "num_hashes": name_filter.num_hashes,
+        "items": name_filter.items,
+        "bits": bytes(name_filter.bits),
+    }
+    # Unique temporary file, so workers saving the filter at the same time never share one
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(filename) + '.',
+                                     dir=os.path.dirname(filename) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(state, f)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filename)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_name_filter(filename: str, dataset_version: str, fp_rate: float = BLOOM_FP_RATE) -> Optional[BloomFilter]:
+    """Loads a stored filter, or None if there is none for this format, dataset version and FP rate."""
+    if not os.path.exists(filename):
+        return None
+    with open(filename, 'rb') as f:
+        state = pickle.load(f)
+    if (state.get("format") != FILTER_FORMAT or state["dataset_version"] != dataset_version
+            or state["fp_rate"] != fp_rate):
+        return None
+    name_filter = BloomFilter(1, fp_rate, dataset_version)
+    name_filter.num_bits = state["num_bits"]
+    name_filter.num_hashes = state["num_hashes"]
+    name_filter.items = state["items"]
+    name_filter.bits = bytearray(state["bits"])
+    return name_filter
+
+
+def load_or_build_name_filter(persons: Iterable[SanctionedPerson], dataset_version: str, filename: str,
+                              fp_rate: float = BLOOM_FP_RATE) -> BloomFilter:
+    """Reuses the stored filter when it matches the dataset version, otherwise builds and stores a new one."""
+    try:
+        name_filter = load_name_filter(filename, dataset_version, fp_rate)
+        if name_filter is not None:
+            return name_filter
+    except Exception as e:
+        print(f"Warning: could not load name filter '{filename}': {e}")
+    name_filter = build_name_filter(persons, dataset_version, fp_rate)
+    try:
+        save_name_filter(name_filter, filename)
+    except OSError as e:
+        # The filter still serves this process; the next load rebuilds it
+        print(f"Warning: could not store name filter '{filename}': {e}")
+    print(f"Built name filter over {name_filter.items} tokens and token pairs ({len(name_filter.bits)} bytes)")
+    return name_filter
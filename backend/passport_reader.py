@@ -2,34 +2,143 @@ from passporteye import read_mrz
 import os
 import warnings
 import re
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, Any
+from tqdm import tqdm
 warnings.filterwarnings("ignore")
 import pytesseract
 pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'  # Update this path if necessary
 
-# Path to passport image (ensure it's clear and properly aligned)
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.pdf'}
 
-files = os.listdir('downloads')
-def read_passport(image_path):
+def mrz_fields(mrz) -> Dict[str, Any]:
+    """
+    Extracts the fields we screen on from a passporteye MRZ object.
+    `valid` is True only when every MRZ check digit verifies.
+    """
+    mrz_data = mrz.to_dict()
+    names = mrz_data['names']
+    names = re.split(r'\s+K', names)[0]  # Remove any K suffix
+    return {
+        "names": names.strip(),
+        "surname": mrz_data['surname'].strip(),
+        "number": mrz_data.get('number', '').replace('<', '').strip(),
+        "date_of_birth": mrz_data.get('date_of_birth', '').strip(),
+        "nationality": mrz_data.get('nationality', '').replace('<', '').strip(),
+        "country": mrz_data.get('country', '').replace('<', '').strip(),
+        "valid": bool(mrz_data.get('valid')),
+    }
+
+def read_passport(image_path) -> Optional[Dict[str, Any]]:
     """
     Reads the MRZ from the given image path.
+    Returns the MRZ fields or None if no MRZ was found.
     """
     try:
         # Read the MRZ from the image
         mrz = read_mrz(image_path)
 
         if mrz is not None:
-            mrz_data = mrz.to_dict()
-            names = mrz_data['names']
-            names = re.split(r'\s+K', names)[0]
-            names = names.strip()
-            mrz_data['names'] = names
-            full_name = f"{mrz_data['names']} {mrz_data['surname'].strip()}"
-            print("Extracted Name:", full_name)
+            fields = mrz_fields(mrz)
+            print("Extracted Name:", f"{fields['names']} {fields['surname']}")
+            return fields
         else:
             print("MRZ not detected.")
+            return None
     except Exception as e:
         print(f"Error reading MRZ: {e}")
         return None
-    
-for file in files:
-    read_passport(os.path.join('downloads', file))
\ No newline at end of file
+
+# --- Batch Mode ---
+
+def file_signature(path: str) -> str:
+    """Size and modification time, so a replaced file is processed again."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def load_manifest(manifest_file: str) -> Dict[str, str]:
+    """Loads the files already processed by earlier runs, mapped to their signature."""
+    processed = {}
+    if not os.path.exists(manifest_file):
+        return processed
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                processed[entry['file']] = entry['signature']
+            except (ValueError, KeyError):
+                continue  # Skip a partially written last line
+    return processed
+
+def _read_passport_record(path: str) -> Dict[str, Any]:
+    """Worker task: OCR one file into a JSON-serializable result record."""
+    record = {"file": path}
+    try:
+        mrz = read_mrz(path)
+        if mrz is None:
+            record["status"] = "no_mrz"
+        else:
+            record["status"] = "ok"
+            record.update(mrz_fields(mrz))
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    return record
+
+def batch_read_passports(input_dir: str, output_file: str, manifest_file: str,
+                         workers: Optional[int] = None, sanctions_file: Optional[str] = None) -> int:
+    """
+    OCRs every image in input_dir on a process pool and appends one JSON line per file to output_file.
+    Files listed in the manifest with an unchanged signature are skipped, so an interrupted run resumes.
+    With sanctions_file, each extracted name is screened against that pickle in the same pass.
+    Returns the number of files processed.
+    """
+    processed = load_manifest(manifest_file)
+    files = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir)
+                   if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+    pending = [path for path in files if processed.get(path) != file_signature(path)]
+    print(f"{len(files)} images in '{input_dir}', {len(files) - len(pending)} already processed, {len(pending)} to do.")
+    if not pending:
+        return 0
+
+    store = None
+    if sanctions_file:
+        # Imported here so plain OCR runs do not need the sanctions dependencies
+        from sanction_search_v2 import load_sanctioned_persons
+        from sanctions_store import MemorySanctionsStore, check_passport_sanctions
+        store = MemorySanctionsStore(load_sanctioned_persons(sanctions_file))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(output_file, 'a', encoding='utf-8') as out, \
+            open(manifest_file, 'a', encoding='utf-8') as manifest:
+        futures = {pool.submit(_read_passport_record, path): path for path in pending}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Reading passports"):
+            path = futures[future]
+            record = future.result()
+            if store is not None and record["status"] == "ok":
+                match = check_passport_sanctions(record, store)
+                record["sanctions_match"] = {"name": match.name, "id": match.id, "source": match.source} if match else None
+            # Result first, then manifest: a crash in between reprocesses the file rather than losing it
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            manifest.write(json.dumps({"file": path, "signature": file_signature(path)}) + "\n")
+            manifest.flush()
+    return len(pending)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Batch passport MRZ reader')
+    parser.add_argument('input_dir', nargs='?', default='downloads',
+                        help='Directory of passport images')
+    parser.add_argument('--output', default='passport_results.jsonl',
+                        help='JSONL file results are appended to')
+    parser.add_argument('--manifest', default='passport_manifest.jsonl',
+                        help='JSONL file of processed files, used to resume')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of OCR processes (default: number of CPUs)')
+    parser.add_argument('--screen', metavar='PICKLE_FILE', default=None,
+                        help='Screen extracted names against this sanctions pickle')
+    args = parser.parse_args()
+
+    batch_read_passports(args.input_dir, args.output, args.manifest, args.workers, args.screen)
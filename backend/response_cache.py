@@ -0,0 +1,90 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used key once maxsize is reached."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+    Concurrent callers with the same key await the task started by the first caller;
+    the task is shielded so a disconnecting caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None) if self._inflight.get(key) is t else None)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+class ResponseCache:
+    """
+    LRU response cache in front of a single-flight group.
+    Keys should include the dataset version so entries stop matching once new data is published.
+    Failed computations raise and are never cached, nor are results rejected by `cacheable`.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.lru = LRUCache(maxsize)
+        self.single_flight = SingleFlight()
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        cached = self.lru.get(key)
+        if cached is not None:
+            return cached
+
+        async def compute_and_store():
+            value = await compute()
+            if cacheable is None or cacheable(value):
+                self.lru.put(key, value)
+            return value
+
+        return await self.single_flight.do(key, compute_and_store)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self.lru),
+            "max_size": self.lru.maxsize,
+            "hits": self.lru.hits,
+            "misses": self.lru.misses,
+            "coalesced": self.single_flight.coalesced,
+        }
@@ -0,0 +1,198 @@
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Iterable, Set, FrozenSet
+
+from sanction_search_v2 import SanctionedPerson, person_names
+from country_codes import countries_mentioned, normalize_country_code
+
+MONTHS = {m: i for i, m in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+# Longest letters-only group joined to the digits after it, like the "OR" of "OR 123456"
+MAX_DOCUMENT_PREFIX = 3
+# Short words in front of a number that are not part of it ("Passport No 12345"), besides month names
+NOT_DOCUMENT_PREFIXES = {'no', 'nr'}
+
+# --- Key Normalization ---
+
+def normalize_document_numbers(value: Optional[str]) -> List[str]:
+    """
+    Extracts normalized document numbers from a free-text passport / ID field.
+    Keys are uppercase alphanumerics with the OCR-ambiguous O and I folded to 0 and 1,
+    so an MRZ read and a list entry produce the same key. The MRZ has no spaces, so groups
+    separated only by spaces are also joined, up to three at a time, when they form one
+    number: groups with digits, optionally after a short letters-only prefix that is not a
+    month ("OR 123456" -> OR123456, but not "issued 12 Mar 2005").
+    """
+    if not value:
+        return []
+    keys = []
+    for run in re.split(r'\s*[^\sA-Za-z0-9\-/<]+\s*', str(value)):
+        groups = [re.sub(r'[^A-Z0-9]', '', token.upper()) for token in re.findall(r'[A-Za-z0-9][A-Za-z0-9\-/<]*', run)]
+        for start in range(len(groups)):
+            first = groups[start]
+            joinable = any(c.isdigit() for c in first) or (
+                len(first) <= MAX_DOCUMENT_PREFIX and first.lower() not in MONTHS
+                and first.lower() not in NOT_DOCUMENT_PREFIXES)
+            for end in range(start + 1, min(start + 3, len(groups)) + 1):
+                if end > start + 1 and not (joinable and any(c.isdigit() for c in groups[end - 1])):
+                    break
+                key = ''.join(groups[start:end])
+                # Document numbers contain digits and are at least 5 characters long
+                if len(key) >= 5 and any(c.isdigit() for c in key):
+                    keys.append(key.replace('O', '0').replace('I', '1'))
+    return list(dict.fromkeys(keys))
+
+def normalize_dates(value: Optional[str]) -> List[str]:
+    """
+    Extracts date keys from a free-text DOB field ("12 Mar. 1960", "1960-03-12", "a) 1955 b) 1956").
+    Full dates become YYYY-MM-DD keys, bare years become YYYY keys.
+    """
+    if not value:
+        return []
+    text = str(value)
+    keys = []
+    for day, month, year in re.findall(r'\b(\d{1,2})\s+([A-Za-z]{3})[a-z]*\.?\s+(\d{4})\b', text):
+        if month.lower() in MONTHS:
+            keys.append(f"{year}-{MONTHS[month.lower()]:02d}-{int(day):02d}")
+    for year, month, day in re.findall(r'\b(\d{4})-(\d{2})-(\d{2})\b', text):
+        keys.append(f"{year}-{month}-{day}")
+    for day, month, year in re.findall(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b', text):
+        keys.append(f"{year}-{int(month):02d}-{int(day):02d}")
+    keys.extend(re.findall(r'\b(?:19|20)\d{2}\b', text))
+    return list(dict.fromkeys(keys))
+
+def mrz_date_keys(yymmdd: Optional[str]) -> List[str]:
+    """Converts an MRZ YYMMDD date into date keys for both possible centuries."""
+    if not yymmdd or not re.fullmatch(r'\d{6}', yymmdd):
+        return []
+    yy, mm, dd = yymmdd[:2], yymmdd[2:4], yymmdd[4:]
+    keys = []
+    for century in ('19', '20'):
+        year = century + yy
+        if int(year) <= datetime.now().year:
+            keys.extend([f"{year}-{mm}-{dd}", year])
+    return keys
+
+def name_signature(name: Optional[str]) -> FrozenSet[str]:
+    """Order-independent signature of a name: the set of its lowercased word tokens."""
+    if not name:
+        return frozenset()
+    return frozenset(re.findall(r'[^\W_]+', str(name).lower()))
+
+def rank_signatures(query: FrozenSet[str], supersets: Iterable[FrozenSet[str]],
+                    subsets: Iterable[FrozenSet[str]]) -> List[FrozenSet[str]]:
+    """
+    Orders matching signatures best first: identical token sets, then entries containing every
+    query token (fewest extra tokens first), then entries contained in the query (longest first).
+    """
+    supersets = set(supersets)
+    ranked = sorted(supersets, key=lambda sig: (len(sig) - len(query), sorted(sig)))
+    ranked += sorted(set(subsets) - supersets, key=lambda sig: (-len(sig), sorted(sig)))
+    return ranked
+
+# --- Indexes ---
+
+class IdentifierIndex:
+    """
+    Hash indexes over passport number, national ID, date of birth and nationality.
+    Document numbers give an exact hit on their own; dates of birth and nationalities
+    (keyed by MRZ country code) are only used to confirm and rank candidates found by name.
+    """
+
+    def __init__(self, persons: Iterable[SanctionedPerson] = ()):
+        self.documents: Dict[str, List[SanctionedPerson]] = {}
+        self.dob: Dict[str, List[SanctionedPerson]] = {}
+        self.nationality: Dict[str, List[SanctionedPerson]] = {}
+        for person in persons:
+            self.add(person)
+
+    def add(self, person: SanctionedPerson):
+        for key in normalize_document_numbers(person.passport_no) + normalize_document_numbers(person.national_id):
+            self.documents.setdefault(key, []).append(person)
+        for key in normalize_dates(person.dob):
+            self.dob.setdefault(key, []).append(person)
+        for code in countries_mentioned(person.nationality):
+            self.nationality.setdefault(code, []).append(person)
+
+    def find_by_document(self, number: Optional[str]) -> List[SanctionedPerson]:
+        """Persons whose passport or national ID number equals the given number."""
+        found = []
+        for key in normalize_document_numbers(number):
+            for person in self.documents.get(key, []):
+                if person not in found:
+                    found.append(person)
+        return found
+
+    def dob_score(self, person: SanctionedPerson, mrz_dob: Optional[str]) -> int:
+        """2 if the person's DOB matches the MRZ date exactly, 1 if only the year matches, else 0."""
+        score = 0
+        for key in mrz_date_keys(mrz_dob):
+            if person in self.dob.get(key, []):
+                score = max(score, 2 if '-' in key else 1)
+        return score
+
+    def nationality_score(self, person: SanctionedPerson, mrz_nationality: Optional[str]) -> int:
+        """1 if the person's nationality is the country of the MRZ nationality code, else 0."""
+        return int(person in self.nationality.get(normalize_country_code(mrz_nationality), []))
+
+
+class TokenSetIndex:
+    """
+    Word-order-insensitive name index.
+    Every name and alias is stored under its token-set signature, and an inverted index
+    from token to signatures answers subset / superset queries without scanning the list:
+    "SURNAME, Given" and "Given Middle Surname" both match a query for "given surname".
+    """
+
+    # Entries with fewer tokens than this never match as a subset of a longer query,
+    # otherwise a single common name like "ALI" would match every query containing it.
+    MIN_SUBSET_TOKENS = 2
+
+    def __init__(self, persons: Iterable[SanctionedPerson] = ()):
+        self.signatures: Dict[FrozenSet[str], List[SanctionedPerson]] = {}
+        self.postings: Dict[str, Set[FrozenSet[str]]] = {}
+        for person in persons:
+            self.add(person)
+
+    def add(self, person: SanctionedPerson):
+        for name in person_names(person):
+            signature = name_signature(name)
+            if not signature:
+                continue
+            persons = self.signatures.setdefault(signature, [])
+            if not any(p is person for p in persons):
+                persons.append(person)
+            for token in signature:
+                self.postings.setdefault(token, set()).add(signature)
+
+    def find(self, name: str) -> List[SanctionedPerson]:
+        """
+        Persons matching the name regardless of token order, best first:
+        identical token sets, then entries containing every query token (query is missing
+        middle names), then entries whose tokens all appear in the query (query has extra names).
+        """
+        query = name_signature(name)
+        if not query:
+            return []
+        postings = [self.postings.get(token, set()) for token in query]
+
+        # Entries containing every query token: intersect from the rarest token upwards
+        postings.sort(key=len)
+        supersets = set(postings[0])
+        for signatures in postings[1:]:
+            if not supersets:
+                break
+            supersets &= signatures
+
+        # Entries whose every token is in the query: count query tokens seen per signature
+        seen = Counter(signature for signatures in postings for signature in signatures)
+        subsets = {signature for signature, count in seen.items()
+                   if count == len(signature) and len(signature) >= self.MIN_SUBSET_TOKENS}
+
+        found = []
+        for signature in rank_signatures(query, supersets, subsets):
+            for person in self.signatures[signature]:
+                if not any(p is person for p in found):
+                    found.append(person)
+        return found
@@ -1,10 +1,12 @@
 import pdfplumber
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator
 import re
 import warnings
 import pandas  # Used in uae_list
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import pickle
+import json
+import hashlib
 from tqdm import tqdm
 import os
 import PyPDF2 # For PDF splitting
@@ -38,6 +40,21 @@ def clean_text(text: str) -> str:
 
 # --- PDF Parsing Functions ---
 
+def _bucket_chars_by_column(chars: List[dict], col_bounds_list: List[tuple]) -> List[List[dict]]:
+    """
+    Assigns each character object to every column whose bounds fully contain it, in one pass.
+    Same selection as `page.within_bbox(bounds).chars`, so overlapping columns share characters.
+    """
+    buckets = [[] for _ in col_bounds_list]
+    for char in chars:
+        x0, top, x1, bottom = char['x0'], char['top'], char['x1'], char['bottom']
+        if (x1 - x0) + (bottom - top) <= 0:  # within_bbox never keeps zero-area objects
+            continue
+        for bucket, (b_x0, b_top, b_x1, b_bottom) in zip(buckets, col_bounds_list):
+            if x0 >= b_x0 and x1 <= b_x1 and top >= b_top and bottom <= b_bottom:
+                bucket.append(char)
+    return buckets
+
 def _process_page_for_merged_columns(page: pdfplumber.page.Page, 
                                      page_num_in_chunk: int, 
                                      is_first_page_of_original_document: bool) -> str:
@@ -59,9 +76,9 @@ def _process_page_for_merged_columns(page: pdfplumber.page.Page,
             (width - (col_width + margin), 0, width, height)
         ]
 
-        for col_bounds in col_bounds_list:
-            cropped_page = page.within_bbox(col_bounds)
-            col_text = cropped_page.extract_text(x_tolerance=2, y_tolerance=2)
+        # Bucket characters once instead of cropping the page (and all its objects) per column
+        for col_chars in _bucket_chars_by_column(page.chars, col_bounds_list):
+            col_text = pdfplumber.utils.extract_text(col_chars, x_tolerance=2, y_tolerance=2)
             if col_text:
                 lines = col_text.split('\n')
                 text_parts.append(' '.join(lines))
@@ -86,26 +103,25 @@ def _process_page_for_merged_columns(page: pdfplumber.page.Page,
         print(f"Error processing page {page_num_in_chunk + 1} in chunk '{pdf_name}': {str(e)}")
         return ""
 
-def extract_text_from_pdf_chunk_merged_columns(pdf_chunk_path: str, 
-                                               is_first_chunk_of_original_document: bool) -> str:
+def iter_pdf_chunk_pages_merged_columns(pdf_chunk_path: str,
+                                        is_first_chunk_of_original_document: bool) -> Iterator[str]:
     """
-    Extracts and merges column text from all pages of a given (small) PDF chunk.
+    Yields the merged column text of each page of a given (small) PDF chunk, one page at a time.
     `is_first_chunk_of_original_document` helps identify the absolute first page for special processing.
     """
-    all_text_from_this_chunk = []
     try:
         with pdfplumber.open(pdf_chunk_path) as pdf:
             for i, page_obj in enumerate(pdf.pages):
                 # The "very first page" condition is true if this is the first chunk AND it's the first page of this chunk.
                 is_very_first_page_of_original = (is_first_chunk_of_original_document and i == 0)
                 
-                page_text = _process_page_for_merged_columns(page_obj, i, is_very_first_page_of_original)
+                page_text = _process_page_for_merged_columns(page_obj, i, is_very_first_page_of_original).strip()
                 if page_text:
-                    all_text_from_this_chunk.append(page_text)
-        return " ".join(all_text_from_this_chunk).strip()
+                    yield page_text
+                # Drop the page's parsed objects, otherwise pdfplumber keeps every page of the chunk cached
+                page_obj.flush_cache()
     except Exception as e:
-        print(f"Error in extract_text_from_pdf_chunk_merged_columns for '{pdf_chunk_path}': {e}")
-        return ""
+        print(f"Error in iter_pdf_chunk_pages_merged_columns for '{pdf_chunk_path}': {e}")
 
 def _split_pdf_into_temporary_chunks(input_pdf_path: str, output_folder: str, pages_per_chunk: int = 20) -> List[str]:
     """
@@ -166,13 +182,51 @@ def _split_pdf_into_temporary_chunks(input_pdf_path: str, output_folder: str, pa
             except OSError: pass
     return [] # Return empty if error before full completion
 
+# Entries end with "]." (after the program tag) followed by whitespace and the next entry's first character
+SDN_ENTRY_SEPARATOR = re.compile(r'\]\.(?=\s[A-Z0-9])')
+
+def split_sdn_entries(texts: Iterable[str]) -> Iterator[str]:
+    """
+    Incrementally splits a stream of text pieces into SDN entries on SDN_ENTRY_SEPARATOR.
+    Pieces are joined with a space; only the unfinished tail is carried over to the next piece.
+    """
+    tail = ""
+    for text in texts:
+        tail = f"{tail} {text}" if tail else text
+        last_end = 0
+        for separator in SDN_ENTRY_SEPARATOR.finditer(tail):
+            entry_text = tail[last_end:separator.start()].strip()
+            if entry_text:
+                yield entry_text
+            last_end = separator.end()
+        tail = tail[last_end:]
+    tail = tail.strip()
+    if tail:
+        yield tail
+
+def _iter_sdn_page_texts(temp_chunk_files: List[str]) -> Iterator[str]:
+    """Yields page texts of the chunk files in order, removing each chunk once it has been read."""
+    for i, chunk_file_path in enumerate(tqdm(temp_chunk_files, desc="Processing PDF chunks")):
+        extracted_any = False
+        for page_text in iter_pdf_chunk_pages_merged_columns(chunk_file_path, i == 0):
+            extracted_any = True
+            yield page_text
+        if not extracted_any:
+            print(f"Warning: No text extracted from chunk '{chunk_file_path}'.")
+        
+        try:
+            os.remove(chunk_file_path)
+        except OSError as e:
+            print(f"Warning: Error removing temporary chunk file {chunk_file_path}: {e}")
+
 def sdnlist(main_pdf_path="sdnlist.pdf", pages_per_chunk=20, temp_chunk_folder="temp_sdn_chunks") -> List[SanctionedPerson]:
     """
     Parse SDN list by:
     1. Splitting the main PDF into smaller temporary PDF chunks using PyPDF2.
-    2. Extracting text from each chunk using `extract_text_from_pdf_chunk_merged_columns`.
-    3. Concatenating all extracted text.
-    4. Parsing the concatenated text into SanctionedPerson objects.
+    2. Extracting text from each chunk page by page using `iter_pdf_chunk_pages_merged_columns`.
+    3. Splitting the page texts into entries as they arrive with `split_sdn_entries`.
+    4. Parsing each entry into a SanctionedPerson object.
+    Only the current page and the unfinished entry at its end are held in memory.
     """
     if not os.path.exists(main_pdf_path):
         print(f"Error: SDN PDF not found at '{main_pdf_path}'. Cannot process.")
@@ -188,47 +242,10 @@ def sdnlist(main_pdf_path="sdnlist.pdf", pages_per_chunk=20, temp_chunk_folder="
             except OSError: pass
         return []
     
-    all_text_from_chunks = []
-    print(f"Extracting text from {len(temp_chunk_files)} PDF chunks...")
-    for i, chunk_file_path in enumerate(tqdm(temp_chunk_files, desc="Processing PDF chunks")):
-        is_first_chunk = (i == 0)
-        text_from_chunk = extract_text_from_pdf_chunk_merged_columns(chunk_file_path, is_first_chunk)
-        if text_from_chunk:
-            all_text_from_chunks.append(text_from_chunk)
-        else:
-            print(f"Warning: No text extracted from chunk '{chunk_file_path}'.")
-        
-        try:
-            os.remove(chunk_file_path)
-        except OSError as e:
-            print(f"Warning: Error removing temporary chunk file {chunk_file_path}: {e}")
-            
-    try:
-        if os.path.exists(temp_chunk_folder) and not os.listdir(temp_chunk_folder):
-            os.rmdir(temp_chunk_folder)
-            print(f"Successfully removed temporary chunk folder: '{temp_chunk_folder}'")
-        elif os.path.exists(temp_chunk_folder) and os.listdir(temp_chunk_folder): # Check if it's not empty
-            print(f"Warning: Temporary chunk folder '{temp_chunk_folder}' is not empty. Manual cleanup might be needed.")
-    except Exception as e:
-        print(f"Warning: Error cleaning up temporary folder '{temp_chunk_folder}': {e}")
-
-    if not all_text_from_chunks:
-        print("No text was extracted from any of the PDF chunks. Returning empty list.")
-        return []
-
-    print("Concatenating text from all chunks...")
-    full_text = " ".join(all_text_from_chunks) # Ensure space separation
-    
-    print("Splitting concatenated text into entries...")
-    entries = re.split(r'\]\.(?=\s[A-Z0-9])', full_text)
-
     sanctioned_persons = []
-    print(f"Parsing {len(entries)} potential SDN entries...")
-    for entry_text in tqdm(entries, desc="Parsing SDN entries"):
-        entry_text = entry_text.strip()
-        if not entry_text:
-            continue
-        
+    print(f"Extracting and parsing SDN entries from {len(temp_chunk_files)} PDF chunks...")
+    page_texts = _iter_sdn_page_texts(temp_chunk_files)
+    for entry_text in split_sdn_entries(page_texts):
         if not entry_text.endswith('].'):
             if not re.search(r'\[[A-Z0-9\-]+\]$', entry_text):
                  entry_text += '].'
@@ -240,6 +257,15 @@ def sdnlist(main_pdf_path="sdnlist.pdf", pages_per_chunk=20, temp_chunk_folder="
         if person:
             sanctioned_persons.append(person)
             
+    try:
+        if os.path.exists(temp_chunk_folder) and not os.listdir(temp_chunk_folder):
+            os.rmdir(temp_chunk_folder)
+            print(f"Successfully removed temporary chunk folder: '{temp_chunk_folder}'")
+        elif os.path.exists(temp_chunk_folder) and os.listdir(temp_chunk_folder): # Check if it's not empty
+            print(f"Warning: Temporary chunk folder '{temp_chunk_folder}' is not empty. Manual cleanup might be needed.")
+    except Exception as e:
+        print(f"Warning: Error cleaning up temporary folder '{temp_chunk_folder}': {e}")
+
     print(f"Successfully parsed {len(sanctioned_persons)} SDN entries.")
     return sanctioned_persons
 
@@ -414,8 +440,40 @@ def search_by_name(sanctioned_persons: List[SanctionedPerson], query: str) -> Op
         #             return person
     return None
 
-def save_sanctioned_persons(persons: List[SanctionedPerson], filename: str):
-    """Saves a list of SanctionedPerson objects to a pickle file."""
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase a name and collapse whitespace so it can be used as a lookup key."""
+    if not name:
+        return ""
+    return ' '.join(str(name).lower().split())
+
+def person_names(person: SanctionedPerson) -> List[str]:
+    """Returns the primary name followed by every good and low quality alias."""
+    names = [person.name] if person.name else []
+    for alias_type in ['good_quality', 'low_quality']:
+        names.extend(alias for alias in person.aliases.get(alias_type, []) if alias)
+    return names
+
+def person_fingerprint(person: SanctionedPerson) -> str:
+    """Stable content hash of a SanctionedPerson, used to spot entries that changed between list versions."""
+    payload = json.dumps(asdict(person), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+def dataset_version(fingerprints: Iterable[str]) -> str:
+    """Order-independent version id of a dataset, derived from its entry fingerprints."""
+    digest = hashlib.sha1()
+    for fingerprint in sorted(fingerprints):
+        digest.update(fingerprint.encode('ascii'))
+    return digest.hexdigest()[:16]
+
+def save_sanctioned_persons(persons: List[SanctionedPerson], filename: str, backend: str = 'pickle'):
+    """
+    Saves a list of SanctionedPerson objects to a pickle file.
+    With backend='sqlite' a SQLite database with FTS5 name indexes is written instead.
+    """
+    if backend == 'sqlite':
+        from sanctions_store import SqliteSanctionsStore  # Local import, sanctions_store depends on this module
+        SqliteSanctionsStore.build(persons, filename)
+        return
     with open(filename, 'wb') as f:
         pickle.dump(persons, f)
     print(f"Saved {len(persons)} entries to '{filename}'.")
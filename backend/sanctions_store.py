@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional
+
+from sanction_search_v2 import SanctionedPerson, person_names, person_fingerprint, dataset_version
+from sanction_index import (IdentifierIndex, TokenSetIndex, name_signature, normalize_document_numbers,
+                            normalize_dates, mrz_date_keys, rank_signatures)
+from country_codes import country_mentioned, countries_mentioned, normalize_country_code
+
+# Backend used by the API, 'memory' (default) or 'sqlite'
+SANCTIONS_BACKEND = os.environ.get('SANCTIONS_BACKEND', 'memory').lower()
+# Path to the SQLite database used by the 'sqlite' backend
+SANCTIONS_DB_FILE = os.environ.get('SANCTIONS_DB_FILE', 'sanctioned_people.sqlite')
+
+
+class MemorySanctionsStore:
+    """Keeps every SanctionedPerson in RAM together with its lookup indexes."""
+
+    def __init__(self, persons: Optional[List[SanctionedPerson]] = None):
+        self.persons = persons or []
+        self.identifier_index = IdentifierIndex(self.persons)
+        self.name_index = TokenSetIndex(self.persons)
+        self.version = dataset_version(person_fingerprint(p) for p in self.persons)
+
+    def __len__(self) -> int:
+        return len(self.persons)
+
+    def __iter__(self) -> Iterator[SanctionedPerson]:
+        return iter(self.persons)
+
+    def find_by_name(self, name: str) -> List[SanctionedPerson]:
+        return self.name_index.find(name)
+
+    def find_by_document(self, number: Optional[str]) -> List[SanctionedPerson]:
+        return self.identifier_index.find_by_document(number)
+
+    def dob_score(self, person: SanctionedPerson, mrz_dob: Optional[str]) -> int:
+        return self.identifier_index.dob_score(person, mrz_dob)
+
+    def nationality_score(self, person: SanctionedPerson, mrz_nationality: Optional[str]) -> int:
+        return self.identifier_index.nationality_score(person, mrz_nationality)
+
+
+class SqliteSanctionsStore:
+    """
+    Sanctions data in a local SQLite database, for low-memory deployments.
+    Names and aliases are indexed with FTS5, document numbers with a regular index.
+    The database is rebuilt into a temporary file and swapped in atomically, so any
+    number of processes can read it while a new version is written.
+    """
+
+    SCHEMA = """
+        CREATE TABLE persons (id INTEGER PRIMARY KEY, fingerprint TEXT NOT NULL, data TEXT NOT NULL);
+        CREATE TABLE names (id INTEGER PRIMARY KEY, person_id INTEGER NOT NULL,
+                            signature TEXT NOT NULL, n_tokens INTEGER NOT NULL);
+        CREATE VIRTUAL TABLE names_fts USING fts5(signature, content='names', content_rowid='id',
+                                                  tokenize='unicode61 remove_diacritics 0');
+        CREATE TABLE documents (key TEXT NOT NULL, person_id INTEGER NOT NULL);
+        CREATE INDEX documents_key ON documents (key);
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+    """
+
+    def __init__(self, path: str = SANCTIONS_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+
+    @classmethod
+    def build(cls, persons: List[SanctionedPerson], path: str = SANCTIONS_DB_FILE) -> 'SqliteSanctionsStore':
+        """Writes persons to a new database at path, replacing any existing one."""
+        # Unique temporary file next to the target, so concurrent builds never write the same file
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(path) + '.',
+                                         dir=os.path.dirname(path) or '.')
+        os.close(fd)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, 0o644)
+        conn = sqlite3.connect(temp_path)
+        try:
+            conn.executescript(cls.SCHEMA)
+            for person_id, person in enumerate(persons, start=1):
+                conn.execute("INSERT INTO persons (id, fingerprint, data) VALUES (?, ?, ?)",
+                             (person_id, person_fingerprint(person), json.dumps(asdict(person), ensure_ascii=False)))
+                for name in person_names(person):
+                    signature = name_signature(name)
+                    if signature:
+                        conn.execute("INSERT INTO names (person_id, signature, n_tokens) VALUES (?, ?, ?)",
+                                     (person_id, ' '.join(sorted(signature)), len(signature)))
+                keys = normalize_document_numbers(person.passport_no) + normalize_document_numbers(person.national_id)
+                conn.executemany("INSERT INTO documents (key, person_id) VALUES (?, ?)",
+                                 [(key, person_id) for key in dict.fromkeys(keys)])
+            conn.execute("INSERT INTO names_fts (rowid, signature) SELECT id, signature FROM names")
+            conn.execute("INSERT INTO meta (key, value) VALUES ('version', ?)",
+                         (dataset_version(f for (f,) in conn.execute("SELECT fingerprint FROM persons")),))
+            conn.commit()
+        except BaseException:
+            conn.close()
+            os.remove(temp_path)
+            raise
+        conn.close()
+        os.replace(temp_path, path)
+        print(f"Saved {len(persons)} entries to SQLite store '{path}'.")
+        return cls(path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread read-only connection, reopened when the database file has been replaced."""
+        file_id = os.stat(self.path).st_ino, os.stat(self.path).st_mtime_ns
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.file_id != file_id:
+            if conn is not None:
+                conn.close()
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            self._local.conn, self._local.file_id = conn, file_id
+        return conn
+
+    def _load_persons(self, person_ids: List[int]) -> List[SanctionedPerson]:
+        if not person_ids:
+            return []
+        placeholders = ','.join('?' * len(person_ids))
+        rows = dict(self._connection().execute(
+            f"SELECT id, data FROM persons WHERE id IN ({placeholders})", person_ids).fetchall())
+        return [SanctionedPerson(**json.loads(rows[i])) for i in person_ids if i in rows]
+
+    @property
+    def version(self) -> str:
+        """Dataset version of the database currently on disk, which another process may have replaced."""
+        return self._connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM persons").fetchone()[0]
+
+    def __iter__(self) -> Iterator[SanctionedPerson]:
+        for (data,) in self._connection().execute("SELECT data FROM persons ORDER BY id"):
+            yield SanctionedPerson(**json.loads(data))
+
+    def find_by_name(self, name: str) -> List[SanctionedPerson]:
+        """Same matching and ranking rules as TokenSetIndex.find, with FTS5 for candidate retrieval."""
+        query = name_signature(name)
+        if not query:
+            return []
+        terms = ['"' + token.replace('"', '""') + '"' for token in sorted(query)]
+        conn = self._connection()
+        sql = ("SELECT names.person_id, names.signature FROM names_fts "
+               "JOIN names ON names.id = names_fts.rowid WHERE names_fts MATCH ?")
+
+        # Entries containing every query token
+        supersets = {}
+        for person_id, signature in conn.execute(sql, (' AND '.join(terms),)):
+            supersets.setdefault(frozenset(signature.split()), []).append(person_id)
+
+        # Entries whose every token is in the query
+        subsets = {}
+        if len(query) >= TokenSetIndex.MIN_SUBSET_TOKENS:
+            for person_id, signature in conn.execute(sql + " AND names.n_tokens BETWEEN ? AND ?",
+                                                     (' OR '.join(terms), TokenSetIndex.MIN_SUBSET_TOKENS, len(query))):
+                tokens = frozenset(signature.split())
+                if tokens <= query:
+                    subsets.setdefault(tokens, []).append(person_id)
+
+        person_ids = []
+        for signature in rank_signatures(query, supersets, subsets):
+            for person_id in supersets.get(signature) or subsets[signature]:
+                if person_id not in person_ids:
+                    person_ids.append(person_id)
+        return self._load_persons(person_ids)
+
+    def find_by_document(self, number: Optional[str]) -> List[SanctionedPerson]:
+        person_ids = []
+        for key in normalize_document_numbers(number):
+            for (person_id,) in self._connection().execute("SELECT person_id FROM documents WHERE key = ?", (key,)):
+                if person_id not in person_ids:
+                    person_ids.append(person_id)
+        return self._load_persons(person_ids)
+
+    def dob_score(self, person: SanctionedPerson, mrz_dob: Optional[str]) -> int:
+        person_dates = set(normalize_dates(person.dob))
+        score = 0
+        for key in mrz_date_keys(mrz_dob):
+            if key in person_dates:
+                score = max(score, 2 if '-' in key else 1)
+        return score
+
+    def nationality_score(self, person: SanctionedPerson, mrz_nationality: Optional[str]) -> int:
+        return int(normalize_country_code(mrz_nationality) in countries_mentioned(person.nationality))
+
+
+def check_passport_sanctions(passport: Dict[str, str], store) -> Optional[SanctionedPerson]:
+    """
+    Check passport MRZ data against sanctions lists.
+    A document number hit is returned when the entry also agrees with the passport on the
+    name, the exact date of birth or the issuing country of its documents; otherwise name
+    candidates are ranked by how well their DOB agrees with the MRZ date of birth, then by
+    whether their nationality agrees with the MRZ nationality.
+    """
+    full_name = f"{passport['names']} {passport['surname']}"
+    name_hits = store.find_by_name(full_name) if full_name.strip() else []
+    document_hits = store.find_by_document(passport.get('number'))
+    if document_hits:
+        # Prefer a document hit whose name also matches
+        for person in document_hits:
+            if person in name_hits:
+                return person
+        # A bare number collides across issuing countries, so require a second field to agree
+        issuing_country = passport.get('country') or passport.get('nationality')
+        for person in document_hits:
+            # A birth year alone, tried for both centuries, is too weak to confirm a number
+            if (store.dob_score(person, passport.get('date_of_birth')) == 2
+                    or country_mentioned(issuing_country, f"{person.passport_no or ''} {person.national_id or ''}")):
+                return person
+
+    if not name_hits:
+        return None
+    return max(name_hits, key=lambda p: (store.dob_score(p, passport.get('date_of_birth')),
+                                         store.nationality_score(p, passport.get('nationality'))))
+
+
+def create_sanctions_store(persons: List[SanctionedPerson], backend: str = SANCTIONS_BACKEND):
+    """Builds the configured store for persons. The sqlite backend writes SANCTIONS_DB_FILE."""
+    if backend == 'sqlite':
+        return SqliteSanctionsStore.build(persons, SANCTIONS_DB_FILE)
+    return MemorySanctionsStore(persons)
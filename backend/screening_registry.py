@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, List, Set, Any
+
+from sanction_search_v2 import SanctionedPerson, normalize_name, person_names
+from sanction_index import TokenSetIndex, name_signature
+
+# Append-only log of every name that has been screened through the API
+REGISTRY_FILE = 'screened_names.jsonl'
+# Latest delta re-screening result
+REPORT_FILE = 'rescreen_report.json'
+
+
+class ScreenedNameRegistry:
+    """
+    Persisted set of previously screened names.
+    Names are kept normalized and indexed by token so that a changed sanctions entry
+    only has to be compared with the screened names it shares a word with.
+    """
+
+    def __init__(self, path: str = REGISTRY_FILE):
+        self.path = path
+        self._names: Set[str] = set()
+        self._token_index: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Bytes of the file read so far; other workers append to the same file
+        self._offset = 0
+        self.reload()
+        if os.path.exists(self.path):
+            print(f"Loaded {len(self._names)} screened names from '{self.path}'.")
+
+    def reload(self):
+        """Merges the names appended to the file since it was last read, e.g. by other API workers."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with self._lock, open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+                # A line still being written is picked up by the next reload
+                complete = data[:data.rfind(b'\n') + 1]
+                self._offset += len(complete)
+                for line in complete.decode('utf-8', errors='replace').splitlines():
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._index(json.loads(line)['name'])
+                    except (ValueError, KeyError):
+                        continue  # Skip a corrupt line
+        except Exception as e:
+            print(f"Error loading screened names registry '{self.path}': {e}")
+
+    def _index(self, name: str):
+        self._names.add(name)
+        for token in name_signature(name):
+            self._token_index.setdefault(token, set()).add(name)
+
+    def add(self, name: str) -> bool:
+        """Records a screened name. Returns True if the name was not registered before."""
+        name = normalize_name(name)
+        if not name:
+            return False
+        with self._lock:
+            if name in self._names:
+                return False
+            self._index(name)
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({"name": name, "screened_at": datetime.now().isoformat()}) + "\n")
+            except OSError as e:
+                print(f"Warning: could not persist screened name: {e}")
+        return True
+
+    def candidates(self, text: str) -> Set[str]:
+        """Screened names sharing at least one token with the given text."""
+        found = set()
+        with self._lock:
+            for token in name_signature(text):
+                found |= self._token_index.get(token, set())
+        return found
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+def rescreen_changed_entries(changed: List[SanctionedPerson],
+                             registry: ScreenedNameRegistry) -> List[Dict[str, Any]]:
+    """
+    Matches only the changed entries against the registry of screened names.
+    Screened names sharing a token with a changed entry are checked with the same
+    token-set rule as check_sanctions, against an index of the changed entries only.
+    The registry is reloaded first so names screened by other workers are included.
+    """
+    registry.reload()
+    changed_index = TokenSetIndex(changed)
+    candidates = set()
+    for person in changed:
+        for name in person_names(person):
+            candidates |= registry.candidates(name)
+
+    hits = []
+    for screened_name in sorted(candidates):
+        for person in changed_index.find(screened_name):
+            hits.append({
+                "screened_name": screened_name,
+                "matched_name": person.name,
+                "id": person.id,
+                "source": person.source,
+            })
+    return hits
+
+
+def save_rescreen_report(hits: List[Dict[str, Any]], changed_count: int, filename: str = REPORT_FILE) -> Dict[str, Any]:
+    """Writes the new hits found by a delta re-screening to a JSON report and returns it."""
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "changed_entries": changed_count,
+        "new_hits": hits,
+    }
+    # Several workers may write the report at once; write it whole so readers never see a partial one
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(filename) + '.',
+                                     dir=os.path.dirname(filename) or '.')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, filename)
+    print(f"Delta re-screening: {changed_count} changed entries, {len(hits)} new hits.")
+    return report
+
+
+def load_rescreen_report(filename: str = REPORT_FILE) -> Dict[str, Any]:
+    """Loads the last delta re-screening report, or an empty report if none exists."""
+    if not os.path.exists(filename):
+        return {"generated_at": None, "changed_entries": 0, "new_hits": []}
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
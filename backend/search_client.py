@@ -0,0 +1,184 @@
+import os
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+import httpx
+
+from scraper import check_suspicious_content
+
+# Adverse-media search backend: "selenium" drives Chrome, "http" fetches result pages with a pooled client
+SCRAPER_BACKEND = os.environ.get('SCRAPER_BACKEND', 'selenium')
+# Result page URL; {query} is the URL-encoded query and {start} the offset of the first result.
+# Point it at a local stand-in server for testing.
+SEARCH_URL_TEMPLATE = os.environ.get('SEARCH_URL_TEMPLATE', 'https://www.google.com/search?q={query}&start={start}')
+# Result page parser, one of RESULT_PARSERS
+SEARCH_RESULT_PARSER = os.environ.get('SEARCH_RESULT_PARSER', 'google')
+# Connections shared by all concurrent searches
+SEARCH_MAX_CONNECTIONS = int(os.environ.get('SEARCH_MAX_CONNECTIONS', '20'))
+SEARCH_TIMEOUT = float(os.environ.get('SEARCH_TIMEOUT', '10'))
+# Same limits as the Selenium scraper
+MAX_RESULT_PAGES = 5
+RESULTS_PER_PAGE = 10
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+
+# (link, title, description)
+SearchResult = Tuple[str, str, str]
+
+
+class GoogleResultParser(HTMLParser):
+    """
+    Extracts results from a Google result page: each result block's first link, its heading
+    (or link text) as the title, and the snippet as the description.
+    """
+    RESULT_CLASSES = {'MjjYud', 'g'}
+    DESCRIPTION_CLASSES = {'VwiC3b'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.results: List[SearchResult] = []
+        self._result = None
+        self._result_depth = 0
+        self._in_link = False
+        self._in_heading = False
+        self._description_tag = None
+        self._description_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = set((attrs.get('class') or '').split())
+        if self._result is None:
+            if tag == 'div' and classes & self.RESULT_CLASSES:
+                self._result = {'link': None, 'title': [], 'heading': [], 'description': []}
+                self._result_depth = 1
+            return
+        if tag == 'div':
+            self._result_depth += 1
+        if tag == 'a' and self._result['link'] is None and attrs.get('href'):
+            self._result['link'] = _unwrap_redirect(attrs['href'])
+            self._in_link = True
+        elif tag == 'h3' and self._in_link:
+            self._in_heading = True
+        elif self._description_tag is None and classes & self.DESCRIPTION_CLASSES:
+            self._description_tag = tag
+            self._description_depth = 1
+        elif tag == self._description_tag:
+            self._description_depth += 1
+
+    def handle_endtag(self, tag):
+        if self._result is None:
+            return
+        if tag == 'a':
+            self._in_link = False
+        if tag == 'h3':
+            self._in_heading = False
+        if tag == self._description_tag:
+            self._description_depth -= 1
+            if self._description_depth == 0:
+                self._description_tag = None
+        if tag == 'div':
+            self._result_depth -= 1
+            if self._result_depth == 0:
+                self._finish_result()
+
+    def handle_data(self, data):
+        if self._result is None:
+            return
+        if self._in_heading:
+            self._result['heading'].append(data)
+        elif self._in_link:
+            self._result['title'].append(data)
+        elif self._description_tag is not None:
+            self._result['description'].append(data)
+
+    def _finish_result(self):
+        result, self._result = self._result, None
+        self._in_link = False
+        self._in_heading = False
+        self._description_tag = None
+        link = result['link']
+        if link and link.startswith(('http://', 'https://')):
+            title = ' '.join(''.join(result['heading'] or result['title']).split())
+            description = ' '.join(''.join(result['description']).split())
+            self.results.append((link, title, description))
+
+
+def _unwrap_redirect(href: str) -> str:
+    """Resolves Google's /url?q=<target> redirect links to the target."""
+    if href.startswith('/url?'):
+        target = parse_qs(urlparse(href).query).get('q')
+        if target:
+            return target[0]
+    return href
+
+
+def parse_google_results(html: str) -> List[SearchResult]:
+    parser = GoogleResultParser()
+    parser.feed(html)
+    parser.close()
+    return parser.results
+
+
+# Parser name -> function turning a result page into (link, title, description) tuples
+RESULT_PARSERS: Dict[str, Callable[[str], List[SearchResult]]] = {
+    'google': parse_google_results,
+}
+
+
+class HttpSearchClient:
+    """
+    Fetches and parses search result pages over one pooled async HTTP client,
+    so any number of concurrent searches share the same keep-alive connections.
+    """
+
+    def __init__(self, url_template: str = SEARCH_URL_TEMPLATE, parser: str = SEARCH_RESULT_PARSER,
+                 max_connections: int = SEARCH_MAX_CONNECTIONS, timeout: float = SEARCH_TIMEOUT):
+        if parser not in RESULT_PARSERS:
+            raise ValueError(f"Unknown search result parser '{parser}'")
+        self.url_template = url_template
+        self.parse_results = RESULT_PARSERS[parser]
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use, inside the event loop that will use it
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True,
+                                             headers={'User-Agent': USER_AGENT})
+        return self._client
+
+    async def search(self, query: str, max_results: int = 20) -> Tuple[List[str], List[str], List[str], List[bool]]:
+        """Same result shape as scraper.google_search_links: links, titles, descriptions, suspicious flags."""
+        client = self._get_client()
+        links, titles, descriptions, flags = [], [], [], []
+        seen = set()
+        for page in range(MAX_RESULT_PAGES):
+            url = self.url_template.format(query=quote_plus(query), start=page * RESULTS_PER_PAGE)
+            response = await client.get(url)
+            response.raise_for_status()
+            page_results = self.parse_results(response.text)
+            for link, title, description in page_results:
+                if link in seen:
+                    continue
+                seen.add(link)
+                links.append(link)
+                titles.append(title)
+                descriptions.append(description)
+                flags.append(check_suspicious_content(title, description))
+                if len(links) >= max_results:
+                    return links, titles, descriptions, flags
+            if not page_results:
+                break
+        return links, titles, descriptions, flags
+
+    async def find_suspicious_links(self, person_name: str):
+        """Async counterpart of scraper.find_suspicious_links."""
+        return await self.search(f'"{person_name}"')
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,210 @@
+import json
+import multiprocessing
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sanction_search_v2 import (sdnlist, unsanctionslist, uae_list, SanctionedPerson,
+                                person_fingerprint, dataset_version)
+from structured_lists import sdn_xml, sdn_csv, un_consolidated_xml
+
+# Root folder for per-source snapshots: snapshots/<SOURCE>/<version>.pkl plus latest.json
+SNAPSHOT_DIR = 'snapshots'
+# Snapshots kept per source, the latest good one included
+SNAPSHOTS_TO_KEEP = 5
+
+UAE_PDF = 'Copy of SL_1 (24052021) V.2 (1).pdf'
+
+# Source name -> local input files with their parser, in order of preference: the publishers'
+# machine-readable files first, the PDFs as fallback. Sources are assembled in this order.
+SOURCE_FILES = {
+    'SDN': [('sdn.xml', sdn_xml), ('sdn.csv', sdn_csv), ('sdnlist.pdf', sdnlist)],
+    'UN': [('consolidated.xml', un_consolidated_xml), ('unsanctions.pdf', unsanctionslist)],
+    'UAE': [(UAE_PDF, uae_list)],
+}
+
+
+def available_inputs(source: str) -> List[str]:
+    """Input files of a source that exist locally, in order of preference."""
+    return [path for path, _ in SOURCE_FILES[source] if os.path.exists(path)]
+
+
+def parse_source(source: str) -> Tuple[str, List[SanctionedPerson]]:
+    """
+    Parses a source from its most preferred available input, falling back to the next one
+    if a parser fails or yields nothing. Module-level so it can run in a worker process.
+    Returns the input used and its entries.
+    """
+    if source not in SOURCE_FILES:
+        raise ValueError(f"Unknown sanctions source '{source}'")
+    errors = []
+    for path, parser in SOURCE_FILES[source]:
+        if not os.path.exists(path):
+            continue
+        try:
+            persons = parser(path)
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+            continue
+        if persons:
+            return path, persons
+        errors.append(f"{path}: no entries parsed")
+    raise ValueError("; ".join(errors) or "no input available")
+
+
+def _source_dir(source: str, snapshot_dir: str) -> str:
+    return os.path.join(snapshot_dir, source)
+
+
+def latest_snapshot_info(source: str, snapshot_dir: str = SNAPSHOT_DIR) -> Optional[Dict]:
+    """Metadata of the latest good snapshot of a source, or None if there is none yet."""
+    path = os.path.join(_source_dir(source, snapshot_dir), 'latest.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_file(path: str, data: bytes):
+    """
+    Writes data to a unique temporary file next to path and renames it into place, so workers
+    refreshing at the same time never share a temporary file and readers never see a partial one.
+    """
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(path) + '.',
+                                     dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_snapshot(source: str, persons: List[SanctionedPerson], snapshot_dir: str = SNAPSHOT_DIR,
+                   input_file: Optional[str] = None) -> Dict:
+    """Stores a versioned snapshot of one source and points latest.json at it."""
+    folder = _source_dir(source, snapshot_dir)
+    os.makedirs(folder, exist_ok=True)
+    version = dataset_version(person_fingerprint(p) for p in persons)
+    info = {
+        "source": source,
+        "version": version,
+        "entries": len(persons),
+        "input_file": input_file,
+        "created_at": datetime.now().isoformat(),
+        "file": f"{version}.pkl",
+    }
+    _write_file(os.path.join(folder, info["file"]), pickle.dumps(persons))
+    _write_file(os.path.join(folder, 'latest.json'), json.dumps(info, indent=2).encode('utf-8'))
+    _prune_snapshots(folder, keep=info["file"])
+    return info
+
+
+def _mtime(path: str) -> float:
+    # Another worker may prune the file between listing and stat
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _prune_snapshots(folder: str, keep: str):
+    snapshots = sorted((f for f in os.listdir(folder) if f.endswith('.pkl')),
+                       key=lambda f: _mtime(os.path.join(folder, f)), reverse=True)
+    for name in snapshots[SNAPSHOTS_TO_KEEP:]:
+        if name != keep:
+            try:
+                os.remove(os.path.join(folder, name))
+            except OSError:
+                pass
+
+
+def load_snapshot(source: str, snapshot_dir: str = SNAPSHOT_DIR) -> List[SanctionedPerson]:
+    """Loads the latest good snapshot of a source, or an empty list."""
+    info = latest_snapshot_info(source, snapshot_dir)
+    if info is None:
+        return []
+    with open(os.path.join(_source_dir(source, snapshot_dir), info["file"]), 'rb') as f:
+        return pickle.load(f)
+
+
+def seed_missing_snapshots(persons: Iterable[SanctionedPerson], snapshot_dir: str = SNAPSHOT_DIR) -> List[str]:
+    """
+    Snapshots the served entries of every source that has no snapshot yet, grouped by
+    person.source, so a source failing its first refresh (e.g. right after an upgrade from
+    the single pickle) keeps its current entries. Returns the seeded sources.
+    """
+    missing = [source for source in SOURCE_FILES if latest_snapshot_info(source, snapshot_dir) is None]
+    if not missing:
+        return []
+    by_source: Dict[str, List[SanctionedPerson]] = {source: [] for source in missing}
+    for person in persons:
+        if person.source in by_source:
+            by_source[person.source].append(person)
+    seeded = []
+    for source, source_persons in by_source.items():
+        if not source_persons:
+            continue
+        try:
+            info = write_snapshot(source, source_persons, snapshot_dir)
+        except OSError as e:
+            print(f"{source}: could not seed snapshot from served entries: {e}")
+            continue
+        print(f"{source}: seeded snapshot {info['version']} from {info['entries']} served entries")
+        seeded.append(source)
+    return seeded
+
+
+def refresh_snapshots(sources: Optional[List[str]] = None, snapshot_dir: str = SNAPSHOT_DIR) -> Dict[str, str]:
+    """
+    Parses every source concurrently, one process per source, and snapshots each one that succeeds.
+    A source without any local input, or whose inputs all fail to parse, keeps its previous
+    snapshot. Returns a status message per source.
+    """
+    sources = list(sources or SOURCE_FILES)
+    status = {}
+    runnable = []
+    for source in sources:
+        if available_inputs(source):
+            runnable.append(source)
+        else:
+            status[source] = f"skipped, none of {[path for path, _ in SOURCE_FILES[source]]} found"
+    if not runnable:
+        return status
+
+    # spawn: the API calls this from a scheduler thread, and forking a threaded process is unsafe
+    with ProcessPoolExecutor(max_workers=len(runnable), mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(parse_source, source): source for source in runnable}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                input_file, persons = future.result()
+            except Exception as e:
+                status[source] = f"failed, keeping previous snapshot: {e}"
+                continue
+            try:
+                info = write_snapshot(source, persons, snapshot_dir, input_file)
+            except OSError as e:
+                status[source] = f"parsed but could not be saved, keeping previous snapshot: {e}"
+                continue
+            status[source] = f"updated to {info['version']} ({info['entries']} entries from '{input_file}')"
+    for source in sources:
+        print(f"{source}: {status[source]}")
+    return status
+
+
+def assemble_latest_snapshots(snapshot_dir: str = SNAPSHOT_DIR) -> List[SanctionedPerson]:
+    """Concatenates the latest good snapshot of every source into the served dataset."""
+    persons = []
+    for source in SOURCE_FILES:
+        persons.extend(load_snapshot(source, snapshot_dir))
+    return persons
@@ -0,0 +1,253 @@
+import csv
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterator, List, Optional, Set
+
+from sanction_search_v2 import SanctionedPerson, normalize_name
+
+# OFAC ID types stored as national identification numbers
+OFAC_NATIONAL_ID_TYPES = ('National ID No.', 'Cedula No.', 'Identification Number', 'C.U.R.P.', 'D.N.I.',
+                          'NIT #', 'Personal ID Card', 'Tax ID No.', 'SSN')
+# Null marker used in the OFAC CSV files
+OFAC_CSV_NULL = '-0-'
+
+
+# --- Helper Functions ---
+
+def _local_name(tag: str) -> str:
+    """Tag name without its XML namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(elem: ET.Element, name: str) -> Optional[str]:
+    text = (elem.findtext(name) or '').strip()
+    return text or None
+
+
+def iter_xml_records(path: str, record_names: Set[str]) -> Iterator[ET.Element]:
+    """
+    Streams the complete record elements named in `record_names` from an XML file, with
+    namespaces stripped from their tags. Each record is removed from the tree once the caller
+    is done with it, so memory stays flat however large the file is.
+    """
+    open_elements = []
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            open_elements.append(elem)
+            continue
+        open_elements.pop()
+        # Children end before their parent, so a record's whole subtree is stripped by the time it ends
+        elem.tag = _local_name(elem.tag)
+        if elem.tag in record_names:
+            yield elem
+            elem.clear()
+            if open_elements:
+                open_elements[-1].remove(elem)
+
+
+def _join(values: List[str], separator: str = '; ') -> Optional[str]:
+    values = list(dict.fromkeys(v for v in values if v))
+    return separator.join(values) if values else None
+
+
+def _document(number: Optional[str], country: Optional[str]) -> Optional[str]:
+    if not number:
+        return None
+    return f"{number} ({country})" if country else number
+
+
+def _full_name(*parts: Optional[str]) -> str:
+    return ' '.join(p.strip() for p in parts if p and p.strip())
+
+
+# --- OFAC SDN (sdn.xml) ---
+
+def _parse_ofac_xml_entry(entry: ET.Element) -> Optional[SanctionedPerson]:
+    name = _full_name(_child_text(entry, 'firstName'), _child_text(entry, 'lastName'))
+    if not name:
+        return None
+
+    aliases = {'good_quality': [], 'low_quality': []}
+    for aka in entry.iter('aka'):
+        alias = _full_name(_child_text(aka, 'firstName'), _child_text(aka, 'lastName'))
+        if alias:
+            quality = 'low_quality' if _child_text(aka, 'category') == 'weak' else 'good_quality'
+            aliases[quality].append(alias)
+
+    passports, national_ids = [], []
+    for doc in entry.iter('id'):
+        id_type = _child_text(doc, 'idType') or ''
+        number = _document(_child_text(doc, 'idNumber'), _child_text(doc, 'idCountry'))
+        if id_type.startswith('Passport'):
+            passports.append(number)
+        elif id_type.startswith(OFAC_NATIONAL_ID_TYPES):
+            national_ids.append(number)
+
+    nationalities = [_child_text(n, 'country') for n in entry.iter('nationality')]
+    if not any(nationalities):
+        nationalities = [_child_text(c, 'country') for c in entry.iter('citizenship')]
+
+    return SanctionedPerson(
+        id=_child_text(entry, 'uid'), name=name, original_name=None,
+        title=_child_text(entry, 'title'), designation=[],
+        dob=_join([_child_text(d, 'dateOfBirth') for d in entry.iter('dateOfBirthItem')]),
+        aliases=aliases, nationality=_join(nationalities, ', '),
+        passport_no=_join(passports), national_id=_join(national_ids), source="SDN"
+    )
+
+
+def sdn_xml(xml_path: str = 'sdn.xml') -> List[SanctionedPerson]:
+    """Parses OFAC's SDN list from its XML publication (sdn.xml), one entry at a time."""
+    sanctioned_persons = []
+    for entry in iter_xml_records(xml_path, {'sdnEntry'}):
+        person = _parse_ofac_xml_entry(entry)
+        if person:
+            sanctioned_persons.append(person)
+    print(f"Parsed {len(sanctioned_persons)} SDN entries from '{xml_path}'.")
+    return sanctioned_persons
+
+
+# --- OFAC SDN (sdn.csv + alt.csv) ---
+
+def _csv_value(value: Optional[str]) -> Optional[str]:
+    value = (value or '').strip()
+    return None if not value or value == OFAC_CSV_NULL else value
+
+
+def _natural_order(name: str) -> str:
+    """'LAST, First' -> 'First LAST', the order names are written in everywhere else."""
+    last, sep, first = name.partition(', ')
+    return _full_name(first, last) if sep else name
+
+
+def _parse_ofac_remarks(remarks: Optional[str]) -> Dict[str, List[str]]:
+    """Splits the '; '-separated remarks of sdn.csv into DOBs, nationalities, documents and weak aliases."""
+    fields = {'dob': [], 'nationality': [], 'citizen': [], 'passport': [], 'national_id': [], 'weak_aliases': []}
+    if not remarks:
+        return fields
+    for part in remarks.split(';'):
+        part = part.strip().rstrip('.')
+        part = re.sub(r'^alt\.\s+', '', part)
+        if part.startswith('DOB '):
+            fields['dob'].append(part[len('DOB '):])
+        elif part.startswith('nationality '):
+            fields['nationality'].append(part[len('nationality '):])
+        elif part.startswith('citizen '):
+            fields['citizen'].append(part[len('citizen '):])
+        elif part.startswith('Passport '):
+            fields['passport'].append(part[len('Passport '):])
+        elif part.startswith(OFAC_NATIONAL_ID_TYPES):
+            id_type = next(t for t in OFAC_NATIONAL_ID_TYPES if part.startswith(t))
+            fields['national_id'].append(part[len(id_type):].strip())
+        elif part.startswith('a.k.a. '):
+            fields['weak_aliases'].extend(re.findall(r'[\'"]([^\'"]+)[\'"]', part))
+    return fields
+
+
+def _load_ofac_alt_names(alt_csv_path: str) -> Dict[str, List[str]]:
+    """ent_num -> alternate names from alt.csv."""
+    alt_names = {}
+    if not os.path.exists(alt_csv_path):
+        print(f"Warning: '{alt_csv_path}' not found, SDN entries will have no aliases.")
+        return alt_names
+    with open(alt_csv_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 4:
+                continue
+            ent_num, alt_name = _csv_value(row[0]), _csv_value(row[3])
+            if ent_num and alt_name:
+                alt_names.setdefault(ent_num, []).append(alt_name)
+    return alt_names
+
+
+def sdn_csv(csv_path: str = 'sdn.csv', alt_csv_path: Optional[str] = None) -> List[SanctionedPerson]:
+    """
+    Parses OFAC's SDN list from its CSV publication. Aliases come from alt.csv (next to sdn.csv
+    unless given), except the weak a.k.a.s of the remarks column, which are the low quality aliases;
+    DOB, nationality and documents also come from the remarks column.
+    """
+    alt_csv_path = alt_csv_path or os.path.join(os.path.dirname(csv_path), 'alt.csv')
+    alt_names = _load_ofac_alt_names(alt_csv_path)
+    sanctioned_persons = []
+    with open(csv_path, 'r', encoding='utf-8', errors='replace', newline='') as f:
+        # ent_num, SDN_Name, SDN_Type, Program, Title, Call_Sign, Vess_type, Tonnage, GRT, Vess_flag, Vess_owner, Remarks
+        for row in csv.reader(f):
+            if len(row) < 12 or not _csv_value(row[1]):
+                continue
+            ent_num = _csv_value(row[0])
+            individual = (_csv_value(row[2]) or '').lower() == 'individual'
+            name = _natural_order(_csv_value(row[1])) if individual else _csv_value(row[1])
+            remarks = _parse_ofac_remarks(_csv_value(row[11]))
+            # alt.csv lists weak a.k.a.s too; sdn.xml marks them weak, here only the remarks do
+            weak = {normalize_name(a) for a in remarks['weak_aliases']}
+            good_aliases = [_natural_order(a) if individual else a for a in alt_names.get(ent_num, [])
+                            if normalize_name(a) not in weak and normalize_name(_natural_order(a)) not in weak]
+            sanctioned_persons.append(SanctionedPerson(
+                id=ent_num, name=name, original_name=None, title=_csv_value(row[4]), designation=[],
+                dob=_join(remarks['dob']),
+                aliases={'good_quality': good_aliases, 'low_quality': remarks['weak_aliases']},
+                nationality=_join(remarks['nationality'] or remarks['citizen'], ', '),
+                passport_no=_join(remarks['passport']), national_id=_join(remarks['national_id']), source="SDN"
+            ))
+    print(f"Parsed {len(sanctioned_persons)} SDN entries from '{csv_path}'.")
+    return sanctioned_persons
+
+
+# --- UN Consolidated List (consolidated.xml) ---
+
+def _values(elem: ET.Element, name: str) -> List[str]:
+    """Texts of the VALUE children of each `name` child, e.g. <NATIONALITY><VALUE>..</VALUE></NATIONALITY>."""
+    return [value.text.strip() for value in elem.findall(f'{name}/VALUE') if value.text and value.text.strip()]
+
+
+def _un_date_of_birth(item: ET.Element) -> Optional[str]:
+    date = _child_text(item, 'DATE') or _child_text(item, 'YEAR')
+    if date:
+        return date
+    from_year, to_year = _child_text(item, 'FROM_YEAR'), _child_text(item, 'TO_YEAR')
+    if from_year and to_year:
+        return f"{from_year} to {to_year}"
+    return from_year or to_year
+
+
+def _parse_un_record(record: ET.Element) -> Optional[SanctionedPerson]:
+    name = _full_name(*(_child_text(record, f) for f in ('FIRST_NAME', 'SECOND_NAME', 'THIRD_NAME', 'FOURTH_NAME')))
+    if not name:
+        return None
+
+    aliases = {'good_quality': [], 'low_quality': []}
+    for alias in record.findall('INDIVIDUAL_ALIAS') + record.findall('ENTITY_ALIAS'):
+        alias_name = _child_text(alias, 'ALIAS_NAME')
+        if alias_name:
+            quality = 'low_quality' if (_child_text(alias, 'QUALITY') or '').lower() == 'low' else 'good_quality'
+            aliases[quality].append(alias_name)
+
+    passports, national_ids = [], []
+    for doc in record.findall('INDIVIDUAL_DOCUMENT'):
+        doc_type = (_child_text(doc, 'TYPE_OF_DOCUMENT') or '').lower()
+        number = _document(_child_text(doc, 'NUMBER'), _child_text(doc, 'ISSUING_COUNTRY'))
+        if 'passport' in doc_type:
+            passports.append(number)
+        elif 'identification' in doc_type or 'national' in doc_type:
+            national_ids.append(number)
+
+    return SanctionedPerson(
+        id=_child_text(record, 'REFERENCE_NUMBER'), name=name,
+        original_name=_child_text(record, 'NAME_ORIGINAL_SCRIPT'),
+        title=_join(_values(record, 'TITLE'), ', '), designation=_values(record, 'DESIGNATION'),
+        dob=_join([_un_date_of_birth(d) for d in record.findall('INDIVIDUAL_DATE_OF_BIRTH')]),
+        aliases=aliases, nationality=_join(_values(record, 'NATIONALITY'), ', '),
+        passport_no=_join(passports), national_id=_join(national_ids), source="UN"
+    )
+
+
+def un_consolidated_xml(xml_path: str = 'consolidated.xml') -> List[SanctionedPerson]:
+    """Parses the UN Security Council Consolidated List XML, individuals and entities, one record at a time."""
+    sanctioned_persons = []
+    for record in iter_xml_records(xml_path, {'INDIVIDUAL', 'ENTITY'}):
+        person = _parse_un_record(record)
+        if person:
+            sanctioned_persons.append(person)
+    print(f"Parsed {len(sanctioned_persons)} UN entries from '{xml_path}'.")
+    return sanctioned_persons